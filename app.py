@@ -4,78 +4,220 @@ Flask web application for PubMed Paper Finder.
 By Manideep Reddy Eevuri
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
 import sys
+import csv
+import hashlib
+import io
 import json
+import logging
+import re
+import secrets
 import traceback
 from datetime import datetime
-import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 
 # Add the get-papers-list directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'get-papers-list'))
 
 from paper_finder.fetch import PubMedFetcher
+from paper_finder.cache import ResponseCache
 from paper_finder.parser import PubMedParser
 from paper_finder.filter import AffiliationFilter
-from paper_finder.output import CSVExporter
 from llm_service import GroqLLMService
+from search_store import create_search_store
+
+try:
+    import orjson
+except ImportError:  # optional; Flask's built-in JSON provider is used instead
+    orjson = None
+
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+logger = logging.getLogger(__name__)
+
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes responses (e.g. /status polls) with orjson.
+
+    Honours sort_keys and compact like DefaultJSONProvider; dumps() calls
+    passing json.dumps options (indent, separators, ...) are handed to it.
+    """
+
+    def _orjson_option(self, indent=False):
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_option(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 CORS(app)
 
 # Initialize LLM service with Groq API
 GROQ_API_KEY = os.getenv('GROQ_API_KEY', 'your-groq-api-key-here')
-llm_service = GroqLLMService(api_key=GROQ_API_KEY)
+# Replies are cached by prompt, so re-running a search reuses its summaries
+llm_service = GroqLLMService(
+    api_key=GROQ_API_KEY,
+    cache=create_search_store(prefix='llm:'),
+    rpm=max(1, int(os.getenv('GROQ_RPM', '30')))
+)
+
+# Shared cache of PubMed E-utilities responses so repeated or refined
+# queries skip the NCBI round-trip
+pubmed_cache = ResponseCache(
+    path=os.getenv('PUBMED_CACHE_PATH', '.pubmed_cache.sqlite'),
+    ttl=int(os.getenv('PUBMED_CACHE_TTL', '3600')),
+    max_age=int(os.getenv('PUBMED_CACHE_MAX_AGE', '86400'))
+)
+
+# Optional NCBI API key: raises the E-utilities limit from 3 to 10 requests/second
+NCBI_API_KEY = os.getenv('NCBI_API_KEY') or None
+
+# Columns of the CSV returned by /download
+CSV_FIELDNAMES = [
+    'PubmedID', 'Title', 'Publication Date', 'Journal', 'Has Industry Authors',
+    'Industry Authors', 'Companies', 'Corresponding Author Email',
+    'Total Authors', 'Industry Authors Count'
+]
+
+# Search state store (in-process by default, Redis when REDIS_URL is set)
+search_store = create_search_store()
+
+# Finished results keyed by (enhanced query, limit), shared like search state
+result_cache = create_search_store(prefix='results:')
+
+# Bounded pool of background search workers; searches beyond the limit queue
+search_executor = ThreadPoolExecutor(max_workers=int(os.getenv('PUBMED_WORKERS', '8')))
+
+# Shared pool for Groq summaries so a search waits on them concurrently
+llm_executor = ThreadPoolExecutor(max_workers=int(os.getenv('LLM_WORKERS', '10')))
+
+# Papers summarized per Groq request, to stay under the requests-per-minute limit
+LLM_PAPERS_PER_CALL = max(1, int(os.getenv('LLM_PAPERS_PER_CALL', '5')))
+
+
+@dataclass(slots=True)
+class IndustryAuthorOut:
+    """An industry author as returned to the browser (serialized by Flask's JSON provider)."""
+    name: str
+    affiliation: str
+    email: Optional[str]
+
+
+def _csv_line(values):
+    """Encode one CSV record, including its trailing newline."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(values)
+    return buffer.getvalue()
+
+
+CSV_HEADER = _csv_line(CSV_FIELDNAMES)
+
+
+def _paper_csv_line(paper_data):
+    """Encode the /download CSV line for a serialized paper."""
+    return _csv_line([
+        paper_data['pubmed_id'],
+        paper_data['title'],
+        paper_data['publication_date'],
+        paper_data['journal'],
+        'Yes' if paper_data['has_industry_authors'] else 'No',
+        '; '.join(author.name for author in paper_data['industry_authors']),
+        '; '.join(paper_data['companies']),
+        paper_data['corresponding_email'] or '',
+        paper_data['total_authors'],
+        paper_data['industry_authors_count']
+    ])
 
-# Global variable to store search results
-search_results = {}
 
+def _set_search(search_id, state):
+    """Replace the stored state of a search."""
+    search_store.set(search_id, state)
+
+def _update_search(search_id, **fields):
+    """Update individual fields (e.g. progress) of a running search."""
+    search_store.update(search_id, **fields)
+
+def _get_search(search_id):
+    """Return the stored state of a search, or None if unknown."""
+    state = search_store.get(search_id)
+    # A state without a status is not a search the handlers can serve
+    if state is None or 'status' not in state:
+        return None
+    return state
+
+def _start_search(search_id, *args):
+    """Queue perform_search for a new search job on the worker pool."""
+    search_executor.submit(perform_search, search_id, *args)
+
+# Terms that mark a query as already industry-focused, matched in one pass
+INDUSTRY_QUERY_TERMS = re.compile('|'.join(map(re.escape, [
+    'pharma', 'biotech', 'company', 'corp', 'inc', 'ltd',
+    'clinical trial', 'drug', 'therapeutic', 'industry'
+])), re.IGNORECASE)
+
+# Company names and specific-topic terms that widen or narrow the search limit
+COMPANY_QUERY_TERMS = re.compile('|'.join(map(re.escape, [
+    'pfizer', 'roche', 'novartis', 'gsk', 'merck', 'iqvia', 'covance', 'moderna', 'biontech'
+])), re.IGNORECASE)
+SPECIFIC_QUERY_TERMS = re.compile('|'.join(map(re.escape, [
+    'clinical trial', 'drug development', 'pharmaceutical', 'biotech'
+])), re.IGNORECASE)
+
+# Industry collaboration clause appended to queries without an industry focus
+INDUSTRY_QUERY_TAIL = (
+    " AND (industry[Affiliation] OR pharmaceutical[Affiliation] OR biotech[Affiliation]"
+    " OR company[Affiliation] OR corp[Affiliation] OR clinical trial OR drug development)"
+)
+
+@lru_cache(maxsize=1024)
 def enhance_search_query(original_query):
     """
     Enhance the search query to be more focused on industry collaborations.
     """
-    # Industry-focused terms to add
-    industry_terms = [
-        "industry collaboration",
-        "pharmaceutical company",
-        "biotech",
-        "clinical trial",
-        "drug development",
-        "corporate research",
-        "commercial research"
-    ]
-
     # Check if query already contains industry terms
-    query_lower = original_query.lower()
-    has_industry_terms = any(term in query_lower for term in [
-        'pharma', 'biotech', 'company', 'corp', 'inc', 'ltd',
-        'clinical trial', 'drug', 'therapeutic', 'industry'
-    ])
+    has_industry_terms = INDUSTRY_QUERY_TERMS.search(original_query) is not None
 
     # If no industry terms, enhance the query
     if not has_industry_terms:
         # Add industry collaboration terms
-        enhanced = f"({original_query}) AND (industry[Affiliation] OR pharmaceutical[Affiliation] OR biotech[Affiliation] OR company[Affiliation] OR corp[Affiliation] OR clinical trial OR drug development)"
-        return enhanced
+        return '(' + original_query + ')' + INDUSTRY_QUERY_TAIL
     else:
         # Query already has industry focus, just return original
         return original_query
 
 def get_optimal_search_limit(query):
     """Determine optimal search limit based on query specificity for faster results."""
-    query_lower = query.lower()
-
     # If query contains specific company names, search more papers
-    company_names = ['pfizer', 'roche', 'novartis', 'gsk', 'merck', 'iqvia', 'covance', 'moderna', 'biontech']
-    if any(company in query_lower for company in company_names):
+    if COMPANY_QUERY_TERMS.search(query):
         return 150  # More papers for specific company searches
 
     # If query is very specific, search fewer papers for faster results
-    specific_terms = ['clinical trial', 'drug development', 'pharmaceutical', 'biotech']
-    if any(term in query_lower for term in specific_terms):
+    if SPECIFIC_QUERY_TERMS.search(query):
         return 100
 
     # Default for general searches - optimized for speed
@@ -84,7 +226,15 @@ def get_optimal_search_limit(query):
 @app.route('/')
 def index():
     """Main page of the web application."""
-    return render_template('index.html')
+    # index.html has no Jinja markup, so serve it as a static file instead of
+    # rendering it per request. max-age defaults to 0 (no-cache), so browsers
+    # revalidate with the ETag on every visit and get a 304 until a deploy
+    # changes the page, which must match the server's API
+    return send_from_directory(
+        app.template_folder, 'index.html',
+        mimetype='text/html',
+        max_age=int(os.getenv('INDEX_MAX_AGE', '0'))
+    )
 
 @app.route('/search', methods=['POST'])
 def search_papers():
@@ -102,47 +252,174 @@ def search_papers():
             return jsonify({'error': 'Query is required'}), 400
         
         # Generate unique search ID
-        search_id = f"search_{int(time.time())}"
+        search_id = f"search_{secrets.token_urlsafe(8)}"
         
         # Initialize search results
-        search_results[search_id] = {
-            'status': 'running',
-            'progress': 'Starting search...',
+        _set_search(search_id, {
+            'status': 'queued',
+            'progress': 'Waiting for a free search worker...',
             'results': None,
             'error': None
-        }
+        })
         
-        # Start search in background thread
-        thread = threading.Thread(
-            target=perform_search,
-            args=(search_id, query, email, debug, page, page_size, search_limit)
-        )
-        thread.daemon = True
-        thread.start()
+        # Start search in background
+        _start_search(search_id, query, email, debug, page, page_size, search_limit)
         
         return jsonify({'search_id': search_id})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/search/<search_id>', methods=['DELETE'])
+def delete_search(search_id):
+    """
+    Discard a search the client has replaced with a new one.
+
+    Only the per-search state goes; the shared entry in result_cache stays
+    until it expires so identical searches can still reuse it.
+    """
+    search_store.delete(search_id)
+    return '', 204
+
+def _iter_classified_papers(search_id, fetcher, parser, filter_obj, pubmed_ids, batch_size):
+    """Yield (paper, industry_authors, companies) as each efetch batch is fetched and parsed."""
+    total_batches = (len(pubmed_ids) + batch_size - 1) // batch_size
+    xml_responses = fetcher.iter_paper_details(pubmed_ids, batch_size=batch_size)
+
+    for batch_number, xml_response in enumerate(xml_responses, 1):
+        _update_search(search_id, progress=f'Analyzing papers... ({batch_number}/{total_batches} batches)')
+        logger.debug("Parsing XML response %d/%d", batch_number, total_batches)
+
+        for paper in parser.iter_papers(xml_response):
+            yield (paper, *filter_obj.classify_authors(paper.authors))
+
+def _summarize_papers(papers):
+    """Ask the LLM service for summaries of several papers, with None for each if it fails."""
+    try:
+        logger.debug("Generating LLM insights for papers %s", [paper.pubmed_id for paper in papers])
+        return llm_service.summarize_papers([
+            {
+                'title': paper.title,
+                'abstract': getattr(paper, 'abstract', None),
+                'authors': [author.display_name for author in paper.authors[:5]]  # First 5 authors
+            }
+            for paper in papers
+        ])
+    except Exception as e:
+        logger.warning("LLM analysis failed for papers %s: %s", [paper.pubmed_id for paper in papers], e)
+        return [None] * len(papers)
+
+def _submit_summaries(batch):
+    """Start summarizing a batch of (paper_data, paper) pairs, returning (paper_datas, future)."""
+    paper_datas = [paper_data for paper_data, _ in batch]
+    return paper_datas, llm_executor.submit(_summarize_papers, [paper for _, paper in batch])
+
+def _analyze_papers(search_id, fetcher, parser, filter_obj, pubmed_ids):
+    """Fetch, classify and serialize the papers for a list of PubMed IDs."""
+    _update_search(search_id, progress=f'Found {len(pubmed_ids)} papers. Fetching details...')
+    logger.debug("Fetching details for %d papers", len(pubmed_ids))
+
+    # Use smaller batch size for faster initial response
+    batch_size = 50
+
+    # Convert ALL papers to JSON-serializable format
+    results_data = []
+    csv_lines = [CSV_HEADER]
+    llm_batch = []
+    llm_pending = []
+    papers_with_industry = 0
+    total_industry_authors = 0
+
+    classified_papers = _iter_classified_papers(
+        search_id, fetcher, parser, filter_obj, pubmed_ids, batch_size
+    )
+    for i, (paper, industry_authors, companies) in enumerate(classified_papers):
+        has_industry = len(industry_authors) > 0
+        total_industry_authors += len(industry_authors)
+
+        if has_industry:
+            papers_with_industry += 1
+            logger.debug("Paper %s has %d industry authors", paper.pubmed_id, len(industry_authors))
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Paper %s has NO industry authors", paper.pubmed_id)
+            # Let's see why - check first few authors
+            for j, author in enumerate(paper.authors[:3]):  # Check first 3 authors
+                logger.debug("  Author %d: %s %s - Industry: %s", j + 1, author.first_name,
+                             author.last_name, filter_obj.is_industry_affiliation(author))
+                if author.affiliation:
+                    logger.debug("    Affiliation: %s...", author.affiliation[:100])
+                if author.email:
+                    logger.debug("    Email: %s", author.email)
+
+        paper_data = {
+            'pubmed_id': paper.pubmed_id,
+            'title': paper.title,
+            'publication_date': paper.publication_date,
+            'journal': paper.journal,
+            'has_industry_authors': has_industry,
+            'industry_authors': [
+                IndustryAuthorOut(author.display_name, author.affiliation, author.email)
+                for author in industry_authors
+            ] if has_industry else [],
+            'companies': companies,
+            'corresponding_email': paper.corresponding_author_email,
+            'total_authors': len(paper.authors),
+            'industry_authors_count': len(industry_authors),
+            'llm_insights': None  # Filled in once the summary arrives
+        }
+        results_data.append(paper_data)
+        csv_lines.append(_paper_csv_line(paper_data))
+
+        # Generate LLM insights for papers with industry authors in the background,
+        # several papers per request
+        if has_industry and i < 10:  # Limit LLM analysis to first 10 industry papers for speed
+            llm_batch.append((paper_data, paper))
+            if len(llm_batch) == LLM_PAPERS_PER_CALL:
+                llm_pending.append(_submit_summaries(llm_batch))
+                llm_batch = []
+
+    if llm_batch:
+        llm_pending.append(_submit_summaries(llm_batch))
+
+    insights_missing = 0
+    if llm_pending:
+        summarized = sum(len(batch) for batch, _ in llm_pending)
+        _update_search(search_id, progress=f'Generating AI insights for {summarized} papers...')
+        for batch, llm_future in llm_pending:
+            for paper_data, insights in zip(batch, llm_future.result()):
+                paper_data['llm_insights'] = insights
+                # summarize_paper reports Groq errors as a dict with an 'error' key
+                insights_missing += insights is None or 'error' in insights
+
+    logger.debug("Found %d papers with industry authors out of %d total", papers_with_industry, len(results_data))
+    return {
+        'all_papers': results_data,
+        'papers_with_industry': papers_with_industry,
+        'total_industry_authors': total_industry_authors,
+        'insights_missing': insights_missing,  # Summaries that failed or were not returned
+        'csv': ''.join(csv_lines)  # Complete CSV served by /download
+    }
+
 def perform_search(search_id, query, email, debug, page=1, page_size=15, search_limit='fast'):
     """Perform the actual search in a background thread."""
+    if _get_search(search_id) is None:
+        return  # Deleted by the client while queued
     try:
-        print(f"DEBUG: Starting search for query: {query}")
+        _update_search(search_id, status='running', progress='Starting search...')
+        logger.debug("Starting search for query: %s", query)
 
         # Initialize components
-        fetcher = PubMedFetcher(email=email)
+        fetcher = PubMedFetcher(email=email, cache=pubmed_cache, api_key=NCBI_API_KEY)
         parser = PubMedParser()
-        filter_obj = AffiliationFilter(debug=True)  # Always enable debug for web app
-        exporter = CSVExporter(debug=True)
+        filter_obj = AffiliationFilter(debug=debug)
 
         # Step 1: Search PubMed
-        search_results[search_id]['progress'] = 'Searching PubMed...'
+        _update_search(search_id, progress='Searching PubMed...')
 
         # Enhance query to be more industry-focused
         enhanced_query = enhance_search_query(query)
-        print(f"DEBUG: Original query: {query}")
-        print(f"DEBUG: Enhanced query: {enhanced_query}")
+        logger.debug("Original query: %s", query)
+        logger.debug("Enhanced query: %s", enhanced_query)
         # Get search limit based on user preference and query
         if search_limit == 'comprehensive':
             max_results = 250
@@ -151,146 +428,62 @@ def perform_search(search_id, query, email, debug, page=1, page_size=15, search_
         else:  # fast
             max_results = min(75, get_optimal_search_limit(query))
 
-        print(f"DEBUG: Searching PubMed with enhanced query (limit: {max_results}, mode: {search_limit})")
-        # Search with user-selected performance mode
-        pubmed_ids = fetcher.search_papers(enhanced_query, max_results=max_results)
-        print(f"DEBUG: Found {len(pubmed_ids)} PubMed IDs: {pubmed_ids[:5]}")
-
-        if not pubmed_ids:
-            print("DEBUG: No PubMed IDs found")
-            search_results[search_id] = {
-                'status': 'completed',
-                'progress': 'No papers found',
-                'results': {
-                    'papers': [],
-                    'summary': {
-                        'total_papers': 0,
-                        'papers_with_industry': 0,
-                        'total_industry_authors': 0
-                    }
-                },
-                'error': None
-            }
-            return
+        # Identical searches reuse recently finished results (skipped in debug
+        # mode so the filter's diagnostics still run)
+        result_key = hashlib.blake2b(f"{enhanced_query}|{max_results}".encode('utf-8'), digest_size=16).hexdigest()
+        analysis = None if debug else result_cache.get(result_key)
+        if analysis is None:
+            logger.debug("Searching PubMed with enhanced query (limit: %d, mode: %s)", max_results, search_limit)
+            # Search with user-selected performance mode
+            pubmed_ids = fetcher.search_papers(enhanced_query, max_results=max_results)
+            logger.debug("Found %d PubMed IDs: %s", len(pubmed_ids), pubmed_ids[:5])
+
+            if not pubmed_ids:
+                logger.debug("No PubMed IDs found")
+                _update_search(
+                    search_id,
+                    status='completed',
+                    progress='No papers found',
+                    results={
+                        'all_papers': [],
+                        'summary': {
+                            'total_papers': 0,
+                            'papers_with_industry': 0,
+                            'total_industry_authors': 0
+                        }
+                    },
+                    csv=CSV_HEADER,
+                    error=None
+                )
+                return
         
-        # Step 2: Fetch paper details
-        search_results[search_id]['progress'] = f'Found {len(pubmed_ids)} papers. Fetching details...'
-        print(f"DEBUG: Fetching details for {len(pubmed_ids)} papers")
-
-        # Use smaller batch size for faster initial response
-        xml_responses = fetcher.fetch_papers_batch(pubmed_ids, batch_size=50)
-        print(f"DEBUG: Got {len(xml_responses)} XML responses")
-
-        # Step 3: Parse papers
-        search_results[search_id]['progress'] = 'Parsing paper data...'
-        all_papers = []
-        for i, xml_response in enumerate(xml_responses):
-            search_results[search_id]['progress'] = f'Parsing papers... ({i+1}/{len(xml_responses)} batches)'
-            print(f"DEBUG: Parsing XML response {i+1}/{len(xml_responses)}")
-            papers = parser.parse_papers(xml_response)
-            print(f"DEBUG: Parsed {len(papers)} papers from response {i+1}")
-            all_papers.extend(papers)
-
-        print(f"DEBUG: Total papers parsed: {len(all_papers)}")
-
-        # Step 4: Filter for industry authors
-        search_results[search_id]['progress'] = 'Filtering for industry authors...'
-        print(f"DEBUG: Filtering {len(all_papers)} papers for industry authors")
-
-        # Process all papers and identify which have industry authors
-        papers_with_industry = []
-        all_papers_data = []
-
-        for i, paper in enumerate(all_papers):
-            if i % 10 == 0:  # Update progress every 10 papers
-                search_results[search_id]['progress'] = f'Analyzing authors... ({i+1}/{len(all_papers)} papers)'
-            print(f"DEBUG: Analyzing paper {i+1}/{len(all_papers)}: {paper.pubmed_id}")
-            industry_authors = filter_obj.identify_industry_authors(paper.authors)
-
-            if industry_authors:
-                papers_with_industry.append(paper)
-                print(f"DEBUG: ✅ Paper {paper.pubmed_id} has {len(industry_authors)} industry authors")
+            # Step 2: Fetch, parse and analyze papers as each batch arrives
+            analysis = _analyze_papers(search_id, fetcher, parser, filter_obj, pubmed_ids)
+            # Don't pin failed Groq summaries for the whole TTL; the next
+            # identical search runs again and retries them
+            if not analysis['insights_missing']:
+                result_cache.set(result_key, analysis)
             else:
-                print(f"DEBUG: ❌ Paper {paper.pubmed_id} has NO industry authors")
-                # Let's see why - check first few authors
-                for j, author in enumerate(paper.authors[:3]):  # Check first 3 authors
-                    is_industry = filter_obj.is_industry_affiliation(author)
-                    print(f"DEBUG:   Author {j+1}: {author.first_name} {author.last_name} - Industry: {is_industry}")
-                    if author.affiliation:
-                        print(f"DEBUG:     Affiliation: {author.affiliation[:100]}...")
-                    if author.email:
-                        print(f"DEBUG:     Email: {author.email}")
-
-        print(f"DEBUG: Found {len(papers_with_industry)} papers with industry authors out of {len(all_papers)} total")
-        
-        # Step 5: Prepare results
-        search_results[search_id]['progress'] = 'Preparing results...'
-        print(f"DEBUG: Preparing results for {len(all_papers)} papers")
-
-        # Convert ALL papers to JSON-serializable format
-        results_data = []
-        total_industry_authors = 0
-
-        for i, paper in enumerate(all_papers):
-            print(f"DEBUG: Processing paper {i+1}: {paper.pubmed_id}")
-            industry_authors = filter_obj.identify_industry_authors(paper.authors)
-            companies = filter_obj.get_company_affiliations(industry_authors)
-            has_industry = len(industry_authors) > 0
-            total_industry_authors += len(industry_authors)
-            print(f"DEBUG: Paper {paper.pubmed_id} has {len(industry_authors)} industry authors")
-
-            # Generate LLM insights for papers with industry authors
-            llm_insights = None
-            if has_industry and i < 10:  # Limit LLM analysis to first 10 industry papers for speed
-                try:
-                    print(f"DEBUG: Generating LLM insights for paper {paper.pubmed_id}")
-                    author_names = [f"{author.last_name}, {author.first_name or author.initials}"
-                                  for author in paper.authors[:5]]  # First 5 authors
-                    llm_insights = llm_service.summarize_paper(
-                        title=paper.title,
-                        abstract=getattr(paper, 'abstract', None),
-                        authors=author_names
-                    )
-                except Exception as e:
-                    print(f"DEBUG: LLM analysis failed for paper {paper.pubmed_id}: {e}")
-                    llm_insights = None
-
-            paper_data = {
-                'pubmed_id': paper.pubmed_id,
-                'title': paper.title,
-                'publication_date': paper.publication_date,
-                'journal': paper.journal,
-                'has_industry_authors': has_industry,
-                'industry_authors': [
-                    {
-                        'name': f"{author.last_name}, {author.first_name or author.initials}",
-                        'affiliation': author.affiliation,
-                        'email': author.email
-                    }
-                    for author in industry_authors
-                ],
-                'companies': companies,
-                'corresponding_email': paper.corresponding_author_email,
-                'total_authors': len(paper.authors),
-                'industry_authors_count': len(industry_authors),
-                'llm_insights': llm_insights  # Add LLM insights
-            }
-            results_data.append(paper_data)
+                logger.debug("Not caching results for %s: %d summaries missing",
+                             result_key, analysis['insights_missing'])
+        else:
+            logger.debug("Reusing cached results for %s", result_key)
+
+        results_data = analysis['all_papers']
 
         # Apply pagination to results
         total_results = len(results_data)
         total_pages = max(1, (total_results + page_size - 1) // page_size)  # Ceiling division
         start_index = (page - 1) * page_size
         end_index = min(start_index + page_size, total_results)
-        paginated_results = results_data[start_index:end_index]
 
-        print(f"DEBUG: Pagination - Page {page} of {total_pages}, showing {len(paginated_results)} papers")
+        logger.debug("Pagination - Page %d of %d, showing %d papers", page, total_pages, end_index - start_index)
 
         # Create summary with pagination info
         summary = {
-            'total_papers': len(all_papers),
-            'papers_with_industry': len(papers_with_industry),
-            'total_industry_authors': total_industry_authors,
+            'total_papers': total_results,
+            'papers_with_industry': analysis['papers_with_industry'],
+            'total_industry_authors': analysis['total_industry_authors'],
             'total_results': total_results,
             'current_page': page,
             'page_size': page_size,
@@ -304,42 +497,64 @@ def perform_search(search_id, query, email, debug, page=1, page_size=15, search_
             'timestamp': datetime.now().isoformat()
         }
         
-        # Store final results with pagination
-        search_results[search_id] = {
-            'status': 'completed',
-            'progress': 'Search completed successfully!',
-            'results': {
-                'papers': paginated_results,
-                'all_papers': results_data,  # Store all papers for pagination
+        # Store final results; pages are sliced from all_papers on request.
+        # Updates are dropped if the client deleted the search meanwhile.
+        # With the in-process stores, searches that reuse a cached result
+        # share its paper dicts, so they are never modified once stored.
+        _update_search(
+            search_id,
+            status='completed',
+            progress='Search completed successfully!',
+            results={
+                'all_papers': results_data,
                 'summary': summary
             },
-            'error': None
-        }
+            csv=analysis['csv'],
+            error=None
+        )
         
     except Exception as e:
-        search_results[search_id] = {
-            'status': 'error',
-            'progress': 'Search failed',
-            'results': None,
-            'error': str(e)
-        }
+        _update_search(search_id, status='error', progress='Search failed', results=None, error=str(e))
 
 @app.route('/status/<search_id>')
 def get_search_status(search_id):
     """Get the status of a search."""
-    if search_id not in search_results:
+    result = _get_search(search_id)
+    if result is None:
         return jsonify({'error': 'Search not found'}), 404
-    
-    return jsonify(search_results[search_id])
+
+    # Status, progress and error change whenever anything else does, so a
+    # poll that already has this state is answered without re-encoding it
+    state_key = f"{result['status']}|{result['progress']}|{result.get('error')}"
+    etag = hashlib.blake2b(state_key.encode('utf-8'), digest_size=8).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    # Polls only carry the progress and summary; the frontend loads the
+    # papers once from /paginate when the search completes
+    results = result.get('results')
+    payload = {
+        'status': result['status'],
+        'progress': result['progress'],
+        'summary': results['summary'] if results else None,
+        'error': result.get('error')
+    }
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'  # always revalidate
+    return response
 
 @app.route('/paginate/<search_id>', methods=['POST'])
 def paginate_results(search_id):
     """Get a specific page of results without re-searching."""
     try:
-        if search_id not in search_results:
+        result = _get_search(search_id)
+        if result is None:
             return jsonify({'error': 'Search not found'}), 404
 
-        result = search_results[search_id]
         if result['status'] != 'completed' or not result['results']:
             return jsonify({'error': 'No results available'}), 404
 
@@ -381,43 +596,23 @@ def paginate_results(search_id):
 def download_results(search_id):
     """Download search results as CSV."""
     try:
-        if search_id not in search_results:
+        result = _get_search(search_id)
+        if result is None:
             return jsonify({'error': 'Search not found'}), 404
         
-        result = search_results[search_id]
         if result['status'] != 'completed' or not result['results']:
             return jsonify({'error': 'No results available'}), 400
         
-        # Create CSV file
+        # Name the CSV download
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"pubmed_results_{timestamp}.csv"
-        filepath = os.path.join(os.getcwd(), filename)
         
-        # Convert results to CSV format (all papers, not just current page)
-        csv_data = []
-        all_papers = result['results'].get('all_papers', result['results']['papers'])
-        for paper_data in all_papers:
-            # Include all papers with industry status indicator
-            row = {
-                'PubmedID': paper_data['pubmed_id'],
-                'Title': paper_data['title'],
-                'Publication Date': paper_data['publication_date'],
-                'Journal': paper_data['journal'],
-                'Has Industry Authors': 'Yes' if paper_data['has_industry_authors'] else 'No',
-                'Industry Authors': '; '.join([author['name'] for author in paper_data['industry_authors']]),
-                'Companies': '; '.join(paper_data['companies']),
-                'Corresponding Author Email': paper_data['corresponding_email'] or '',
-                'Total Authors': paper_data['total_authors'],
-                'Industry Authors Count': paper_data['industry_authors_count']
-            }
-            csv_data.append(row)
-        
-        # Create DataFrame and save
-        import pandas as pd
-        df = pd.DataFrame(csv_data)
-        df.to_csv(filepath, index=False, encoding='utf-8')
-        
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        # Serve the CSV encoded during the search (all papers, not just current page)
+        return Response(
+            result.get('csv', CSV_HEADER),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -426,15 +621,15 @@ def download_results(search_id):
 def analyze_trends(search_id):
     """Generate research trend analysis using LLM."""
     try:
-        if search_id not in search_results:
+        result = _get_search(search_id)
+        if result is None:
             return jsonify({'error': 'Search not found'}), 404
 
-        result = search_results[search_id]
         if result['status'] != 'completed' or not result['results']:
             return jsonify({'error': 'No results available'}), 404
 
         # Get all papers for trend analysis
-        all_papers = result['results'].get('all_papers', result['results']['papers'])
+        all_papers = result['results']['all_papers']
 
         # Generate trend analysis
         trends = llm_service.analyze_research_trends(all_papers)
@@ -474,15 +669,15 @@ def enhance_query():
 def get_paper_insights(search_id, pubmed_id):
     """Get detailed LLM insights for a specific paper."""
     try:
-        if search_id not in search_results:
+        result = _get_search(search_id)
+        if result is None:
             return jsonify({'error': 'Search not found'}), 404
 
-        result = search_results[search_id]
         if result['status'] != 'completed' or not result['results']:
             return jsonify({'error': 'No results available'}), 404
 
         # Find the specific paper
-        all_papers = result['results'].get('all_papers', result['results']['papers'])
+        all_papers = result['results']['all_papers']
         paper_data = None
         for paper in all_papers:
             if paper['pubmed_id'] == pubmed_id:
@@ -514,8 +709,12 @@ if __name__ == '__main__':
     os.makedirs('templates', exist_ok=True)
     os.makedirs('static', exist_ok=True)
     
-    print("🚀 Starting PubMed Paper Finder Web Application...")
+    print("🚀 Starting PubMed Paper Finder Web Application (development server)...")
     print("📱 Open your browser and go to: http://localhost:5000")
     print("🛑 Press Ctrl+C to stop the server")
+    # Rate limits are per process, so scale with threads rather than workers
+    print("🏭 For production run: gunicorn --preload --worker-class gthread -w 1 --threads 8 app:app")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The reloader and debugger are opt-in (FLASK_DEBUG=1)
+    debug_mode = os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    app.run(debug=debug_mode, host='0.0.0.0', port=5000)
@@ -54,6 +54,12 @@ def search_papers(
         "-e",
         help="Your email address (recommended by NCBI)"
     ),
+    api_key: Optional[str] = typer.Option(
+        None,
+        "--api-key",
+        envvar="NCBI_API_KEY",
+        help="NCBI API key (raises the request limit to 10/second)"
+    ),
     detailed: bool = typer.Option(
         False,
         "--detailed",
@@ -83,6 +89,7 @@ def search_papers(
         console.print("  -d, --debug    Enable debug output")
         console.print("  -f, --file     Output CSV file path")
         console.print("  -e, --email    Your email address (recommended by NCBI)")
+        console.print("  --api-key      NCBI API key (or set NCBI_API_KEY)")
         console.print("  --detailed     Export detailed report with individual author rows")
         console.print("  --max-results  Maximum number of papers to retrieve [default: 20]")
         console.print("\nExample:")
@@ -111,10 +118,10 @@ def search_papers(
     
     try:
         # Initialize components
-        fetcher = PubMedFetcher(email=email)
+        fetcher = PubMedFetcher(email=email, api_key=api_key)
         parser = PubMedParser()
         filter_obj = AffiliationFilter(debug=debug)
-        exporter = CSVExporter(debug=debug)
+        exporter = CSVExporter(debug=debug, filter_obj=filter_obj)
         
         # Step 1: Search PubMed
         console.print("Searching PubMed...")
@@ -135,14 +142,11 @@ def search_papers(
         # Step 2: Fetch paper details
         console.print("Fetching paper details...")
 
-        xml_responses = fetcher.fetch_papers_batch(pubmed_ids)
+        xml_responses = fetcher.iter_paper_details(pubmed_ids)
         console.print("Parsing paper data...")
 
-        # Step 3: Parse papers
-        all_papers = []
-        for xml_response in xml_responses:
-            papers = parser.parse_papers(xml_response)
-            all_papers.extend(papers)
+        # Step 3: Parse papers as each batch arrives
+        all_papers = parser.parse_papers_bulk(xml_responses)
 
         console.print(f"Parsed {len(all_papers)} papers")
 
@@ -218,7 +222,7 @@ def _show_results_preview(papers, filter_obj):
     # Show first 5 papers
     for paper in papers[:5]:
         industry_authors = filter_obj.identify_industry_authors(paper.authors)
-        author_names = [f"{a.last_name}, {a.first_name or a.initials}" for a in industry_authors]
+        author_names = [a.display_name for a in industry_authors]
         
         table.add_row(
             paper.pubmed_id,
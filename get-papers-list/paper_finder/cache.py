@@ -0,0 +1,153 @@
+"""
+On-disk cache for PubMed E-utilities responses.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+
+
+# Parameters that identify the caller rather than the requested data
+_IDENTITY_PARAMS = {"tool", "email", "api_key"}
+
+
+@dataclass
+class CachedResponse:
+    """A stored E-utilities response body with its validators."""
+    content: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for revalidating this entry with the server."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, url: str) -> requests.Response:
+        """Rebuild a requests.Response so callers can use .text / .json()."""
+        response = requests.Response()
+        response._content = self.content
+        response.status_code = 200
+        response.encoding = self.encoding
+        response.url = url
+        return response
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of E-utilities responses keyed by request URL.
+
+    Entries younger than ``ttl`` seconds are served without touching the
+    network. Older entries are revalidated with If-None-Match /
+    If-Modified-Since, so a 304 from NCBI skips the body transfer. Entries
+    not refreshed for ``max_age`` seconds are deleted on the next write, so
+    the file does not grow without bound.
+    """
+
+    def __init__(self, path: str = ".pubmed_cache.sqlite", ttl: int = 3600,
+                 max_age: Optional[int] = None):
+        """
+        Initialize the response cache.
+
+        Args:
+            path: SQLite database file (":memory:" for a process-local cache)
+            ttl: Seconds an entry is served without revalidation
+            max_age: Seconds an entry is kept for revalidation (default 24 * ttl)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age if max_age is not None else 24 * ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return this process's connection, opening it on first use.
+
+        SQLite connections must not be shared across fork(), so a worker
+        forked from a preloaded parent (e.g. gunicorn --preload) opens its own.
+        Callers must hold ``self._lock``.
+        """
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    " key TEXT PRIMARY KEY, content BLOB, encoding TEXT,"
+                    " etag TEXT, last_modified TEXT, stored_at REAL)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)"
+                )
+        return self._conn
+
+    @staticmethod
+    def make_key(url: str, params: Dict[str, str]) -> str:
+        """Build a cache key from the URL and the data-selecting parameters."""
+        query = sorted((k, v) for k, v in params.items() if k not in _IDENTITY_PARAMS)
+        return f"{url}?{urlencode(query)}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Look up a stored response, or None if the key is not cached."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT content, encoding, etag, last_modified, stored_at"
+                " FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        content, encoding, etag, last_modified, stored_at = row
+        return CachedResponse(
+            content=content,
+            encoding=encoding,
+            etag=etag,
+            last_modified=last_modified,
+            fresh=(time.time() - stored_at) < self.ttl
+        )
+
+    def set(self, key: str, response: requests.Response) -> None:
+        """Store a successful response along with its validators, evicting expired ones."""
+        now = time.time()
+        row = (
+            key,
+            response.content,
+            response.encoding,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            now
+        )
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.max_age,))
+                conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", row)
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as fresh again after a 304 Not Modified."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def clear(self) -> None:
+        """Remove all stored responses."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM responses")
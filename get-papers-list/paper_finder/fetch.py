@@ -3,34 +3,140 @@ PubMed API integration module for fetching research papers.
 """
 
 import requests
+import threading
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
 from urllib.parse import quote_plus
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import ResponseCache
+
+
+class _RateLimiter:
+    """Spaces request starts so no more than ``rate`` begin per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """Block until the caller may issue its request."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+        if wait > 0:
+            time.sleep(wait)
 
 
 class PubMedFetcher:
     """Handles interactions with PubMed E-utilities API."""
     
     BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+    # NCBI allows 3 requests/second per IP, or 10 with an API key
+    RATE_LIMIT = 3
+    RATE_LIMIT_WITH_KEY = 10
+
+    # The limit applies per key (or per IP without one), so fetchers share limiters
+    _rate_limiters: Dict[Optional[str], _RateLimiter] = {}
+    _rate_limiters_lock = threading.Lock()
     
-    def __init__(self, email: Optional[str] = None, tool: str = "get-papers-list"):
+    def __init__(self, email: Optional[str] = None, tool: str = "get-papers-list",
+                 cache: Optional[ResponseCache] = None, api_key: Optional[str] = None,
+                 max_workers: int = 3):
         """
         Initialize PubMed fetcher.
         
         Args:
             email: Contact email for API requests (recommended by NCBI)
             tool: Tool name for API requests
+            cache: Optional response cache shared across fetchers
+            api_key: NCBI API key (raises the rate limit to 10 requests/second)
+            max_workers: Maximum number of efetch batches fetched concurrently
         """
         self.email = email
         self.tool = tool
-        self.session = requests.Session()
+        self.cache = cache
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.session = self._create_session()
+        self._rate_limiter = self._shared_rate_limiter(api_key)
+
+    @classmethod
+    def _shared_rate_limiter(cls, api_key: Optional[str]) -> _RateLimiter:
+        """Return the process-wide limiter for this API key (None when unkeyed)."""
+        with cls._rate_limiters_lock:
+            limiter = cls._rate_limiters.get(api_key)
+            if limiter is None:
+                limiter = _RateLimiter(cls.RATE_LIMIT_WITH_KEY if api_key else cls.RATE_LIMIT)
+                cls._rate_limiters[api_key] = limiter
+            return limiter
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """
+        Create a keep-alive session so batches reuse the TCP/TLS connection.
+
+        Transient errors and 429s are retried with backoff, honouring the
+        Retry-After header NCBI sends when throttling. Responses are requested
+        compressed; efetch XML shrinks roughly 10x under gzip.
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+
+        session = requests.Session()
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
         
     def _get_common_params(self) -> Dict[str, str]:
         """Get common parameters for API requests."""
         params = {"tool": self.tool}
         if self.email:
             params["email"] = self.email
+        if self.api_key:
+            params["api_key"] = self.api_key
         return params
+
+    def _get(self, url: str, params: Dict[str, str], timeout: int) -> requests.Response:
+        """
+        GET an E-utilities endpoint, going through the response cache if set.
+
+        Fresh cache entries are returned without a request; stale ones are
+        revalidated and reused when the server answers 304 Not Modified.
+        """
+        if self.cache is None:
+            self._rate_limiter.acquire()
+            response = self.session.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response
+
+        key = self.cache.make_key(url, params)
+        cached = self.cache.get(key)
+        if cached and cached.fresh:
+            return cached.to_response(url)
+
+        headers = cached.conditional_headers() if cached else {}
+        self._rate_limiter.acquire()
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            self.cache.touch(key)
+            return cached.to_response(url)
+
+        response.raise_for_status()
+        self.cache.set(key, response)
+        return response
     
     def search_papers(self, query: str, max_results: int = 1000) -> List[str]:
         """
@@ -53,8 +159,7 @@ class PubMedFetcher:
         }
         
         try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
+            response = self._get(url, params, timeout=30)
             
             data = response.json()
             id_list = data.get("esearchresult", {}).get("idlist", [])
@@ -66,7 +171,7 @@ class PubMedFetcher:
         except KeyError as e:
             raise Exception(f"Unexpected response format from PubMed search: {e}")
     
-    def fetch_paper_details(self, pubmed_ids: List[str]) -> str:
+    def fetch_paper_details(self, pubmed_ids: List[str]) -> bytes:
         """
         Fetch detailed information for papers using PubMed efetch API.
         
@@ -74,10 +179,11 @@ class PubMedFetcher:
             pubmed_ids: List of PubMed IDs
             
         Returns:
-            XML response containing paper details
+            Raw XML response body containing paper details (the parser
+            reads the encoding from the XML declaration)
         """
         if not pubmed_ids:
-            return ""
+            return b""
             
         url = f"{self.BASE_URL}/efetch.fcgi"
         params = {
@@ -88,35 +194,50 @@ class PubMedFetcher:
         }
         
         try:
-            response = self.session.get(url, params=params, timeout=60)
-            response.raise_for_status()
+            response = self._get(url, params, timeout=60)
             
-            return response.text
+            return response.content
             
         except requests.RequestException as e:
             raise Exception(f"Error fetching paper details: {e}")
     
-    def fetch_papers_batch(self, pubmed_ids: List[str], batch_size: int = 200) -> List[str]:
+    def iter_paper_details(self, pubmed_ids: List[str], batch_size: int = 200) -> Iterator[bytes]:
         """
-        Fetch paper details in batches to handle large result sets.
+        Fetch paper details in batches, yielding each XML response as it is ready.
+
+        Batches are fetched concurrently (up to ``max_workers`` at a time);
+        the shared rate limiter keeps the request rate within NCBI's limit.
+        Responses are yielded in batch order so callers can parse and filter
+        the first batch while later ones are still downloading.
         
         Args:
             pubmed_ids: List of PubMed IDs
             batch_size: Number of IDs to fetch per batch
             
-        Returns:
-            List of XML responses
+        Yields:
+            XML responses, in the same order as the batches
         """
-        xml_responses = []
+        batches = [pubmed_ids[i:i + batch_size] for i in range(0, len(pubmed_ids), batch_size)]
+
+        if len(batches) <= 1:
+            xml_responses = map(self.fetch_paper_details, batches)
+            yield from (xml_response for xml_response in xml_responses if xml_response)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            for xml_response in executor.map(self.fetch_paper_details, batches):
+                if xml_response:
+                    yield xml_response
+
+    def fetch_papers_batch(self, pubmed_ids: List[str], batch_size: int = 200) -> List[bytes]:
+        """
+        Fetch paper details in batches to handle large result sets.
         
-        for i in range(0, len(pubmed_ids), batch_size):
-            batch = pubmed_ids[i:i + batch_size]
-            xml_response = self.fetch_paper_details(batch)
-            if xml_response:
-                xml_responses.append(xml_response)
+        Args:
+            pubmed_ids: List of PubMed IDs
+            batch_size: Number of IDs to fetch per batch
             
-            # Be respectful to NCBI servers
-            if i + batch_size < len(pubmed_ids):
-                time.sleep(0.5)
-        
-        return xml_responses
+        Returns:
+            List of XML responses, in the same order as the batches
+        """
+        return list(self.iter_paper_details(pubmed_ids, batch_size))
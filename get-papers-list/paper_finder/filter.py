@@ -2,10 +2,50 @@
 Author affiliation filtering module to identify non-academic authors.
 """
 
-from typing import List, Set, Tuple
+from functools import lru_cache
+from typing import Iterable, List, Set, Tuple
 import re
 from .parser import Author, Paper
 
+try:
+    import ahocorasick
+except ImportError:  # optional speed-up; plain substring checks are used instead
+    ahocorasick = None
+
+
+# Patterns used on every scored author, compiled once
+_ACADEMIC_EMAIL_RE = re.compile(r'@.*\.(edu|ac\.|edu\.)')
+_COMPANY_SUFFIX_RE = re.compile(r'\b(inc|ltd|llc|corp|gmbh)\b')
+_ACADEMIC_NAME_RE = re.compile(r'\b(university|college|institute)\b')
+_AFFILIATION_SPLIT_RE = re.compile(r'[,;]')
+_UNIT_PREFIX_RE = re.compile(r'^(department of|division of|section of)\s+', re.IGNORECASE)
+
+
+class _KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur as substrings of a text.
+
+    With pyahocorasick installed, all keywords are matched in a single pass
+    over the text; otherwise each keyword is checked with ``in``.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keywords)
+        self._automaton = None
+
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text: str) -> Set[str]:
+        """Return the distinct keywords found anywhere in ``text``."""
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return {keyword for keyword in self.keywords if keyword in text}
+
 
 class AffiliationFilter:
     """
@@ -79,6 +119,13 @@ class AffiliationFilter:
             debug: Whether to print debug information
         """
         self.debug = debug
+        self._keyword_matcher = _KeywordMatcher(
+            self.ACADEMIC_KEYWORDS | self.INDUSTRY_KEYWORDS | self.KNOWN_COMPANIES
+        )
+        # Affiliations repeat heavily across authors and papers, so scores are
+        # memoized per filter instance on the normalized (affiliation, email) pair
+        self._cached_scores = lru_cache(maxsize=50_000)(self._compute_scores)
+        self._cached_company_names = lru_cache(maxsize=50_000)(self._extract_company_name)
     
     def filter_papers_with_industry_authors(self, papers: List[Paper]) -> List[Paper]:
         """
@@ -93,16 +140,61 @@ class AffiliationFilter:
         filtered_papers = []
         
         for paper in papers:
+            if not self.debug:
+                # Only membership matters here, so stop at the first industry author
+                if self.has_industry_author(paper.authors):
+                    filtered_papers.append(paper)
+                continue
+
             industry_authors = self.identify_industry_authors(paper.authors)
             
             if industry_authors:
                 # Create a new paper object with only industry authors highlighted
                 filtered_papers.append(paper)
-                
-                if self.debug:
-                    print(f"Paper {paper.pubmed_id} has {len(industry_authors)} industry authors")
+                print(f"Paper {paper.pubmed_id} has {len(industry_authors)} industry authors")
         
         return filtered_papers
+
+    def classify_authors(self, authors: List[Author]) -> Tuple[List[Author], List[str]]:
+        """
+        Identify industry authors and their company affiliations in one pass.
+
+        Equivalent to calling identify_industry_authors followed by
+        get_company_affiliations, without classifying each author twice.
+        
+        Args:
+            authors: List of Author objects
+            
+        Returns:
+            Tuple of (industry authors, company/organization names)
+        """
+        industry_authors = self.identify_industry_authors(authors)
+        if not industry_authors:
+            return industry_authors, []
+
+        # dict preserves first-seen order while de-duplicating
+        companies = {}
+        for author in industry_authors:
+            if author.affiliation:
+                company = self._cached_company_names(author.affiliation)
+                if company:
+                    companies[company] = None
+        
+        return industry_authors, list(companies)
+
+    def has_industry_author(self, authors: List[Author]) -> bool:
+        """
+        Check whether any author has an industry/non-academic affiliation.
+
+        Stops at the first industry author instead of classifying them all.
+        
+        Args:
+            authors: List of Author objects
+            
+        Returns:
+            True if at least one author has an industry affiliation
+        """
+        return any(self.is_industry_affiliation(author) for author in authors)
     
     def identify_industry_authors(self, authors: List[Author]) -> List[Author]:
         """
@@ -138,17 +230,10 @@ class AffiliationFilter:
         Returns:
             True if the author appears to have an industry affiliation
         """
-        affiliation_text = author.affiliation.lower() if author.affiliation else ""
-        email = author.email.lower() if author.email else ""
-
-        # Check email domain first (more reliable)
-        email_score = self._score_email_domain(email)
-
-        # Check affiliation text
-        affiliation_score = self._score_affiliation_text(affiliation_text)
+        affiliation_text = author.affiliation_normalized
+        email = author.email_normalized
 
-        # Combine scores with email having higher weight
-        total_score = (email_score * 0.7) + (affiliation_score * 0.3)
+        email_score, affiliation_score, total_score = self._cached_scores(affiliation_text, email)
 
         if self.debug:
             print(f"  Author: {author.first_name} {author.last_name}")
@@ -159,26 +244,45 @@ class AffiliationFilter:
         # Threshold for considering someone as industry-affiliated
         # Lowered threshold to be more inclusive for industry collaborations
         return total_score > 0.15
+
+    def _compute_scores(self, affiliation_text: str, email: str) -> Tuple[float, float, float]:
+        """
+        Score a normalized affiliation/email pair.
+
+        Returns:
+            Tuple of (email score, affiliation score, combined score)
+        """
+        # Check email domain first (more reliable)
+        email_score = self._score_email_domain(email)
+
+        # Check affiliation text
+        affiliation_score = self._score_affiliation_text(affiliation_text)
+
+        # Combine scores with email having higher weight
+        total_score = (email_score * 0.7) + (affiliation_score * 0.3)
+
+        return email_score, affiliation_score, total_score
     
-    def _score_email_domain(self, email: str) -> float:
+    def _score_email_domain(self, email_lower: str) -> float:
         """
         Score email domain for industry vs academic likelihood.
         
+        Args:
+            email_lower: Email address, already lowercased (Author.email_normalized)
+        
         Returns:
             Score between -1 (definitely academic) and 1 (definitely industry)
         """
-        if not email:
+        if not email_lower:
             return 0.0
         
-        email_lower = email.lower()
-        
         # Strong academic indicators
         for domain in self.ACADEMIC_DOMAINS:
             if domain in email_lower:
                 return -0.8
         
         # Check for specific academic patterns
-        if re.search(r'@.*\.(edu|ac\.|edu\.)', email_lower):
+        if _ACADEMIC_EMAIL_RE.search(email_lower):
             return -0.9
         
         # Industry indicators
@@ -193,36 +297,37 @@ class AffiliationFilter:
         
         return 0.0
     
-    def _score_affiliation_text(self, affiliation: str) -> float:
+    def _score_affiliation_text(self, affiliation_lower: str) -> float:
         """
         Score affiliation text for industry vs academic likelihood.
         
+        Args:
+            affiliation_lower: Affiliation, already lowercased (Author.affiliation_normalized)
+        
         Returns:
             Score between -1 (definitely academic) and 1 (definitely industry)
         """
-        if not affiliation:
+        if not affiliation_lower:
             return 0.0
         
-        affiliation_lower = affiliation.lower()
-        
+        # Find every academic, industry and company keyword in one scan
+        matches = self._keyword_matcher.find(affiliation_lower)
+
         # Count academic keywords
-        academic_count = sum(1 for keyword in self.ACADEMIC_KEYWORDS 
-                           if keyword in affiliation_lower)
+        academic_count = len(matches & self.ACADEMIC_KEYWORDS)
         
         # Count industry keywords
-        industry_count = sum(1 for keyword in self.INDUSTRY_KEYWORDS 
-                           if keyword in affiliation_lower)
+        industry_count = len(matches & self.INDUSTRY_KEYWORDS)
         
         # Special patterns
-        if re.search(r'\b(inc|ltd|llc|corp|gmbh)\b', affiliation_lower):
+        if _COMPANY_SUFFIX_RE.search(affiliation_lower):
             industry_count += 2
         
-        if re.search(r'\b(university|college|institute)\b', affiliation_lower):
+        if _ACADEMIC_NAME_RE.search(affiliation_lower):
             academic_count += 2
 
         # Check for known company names (higher weight)
-        company_matches = sum(1 for company in self.KNOWN_COMPANIES
-                            if company in affiliation_lower)
+        company_matches = len(matches & self.KNOWN_COMPANIES)
         if company_matches > 0:
             industry_count += company_matches * 2  # Give known companies higher weight
 
@@ -253,7 +358,7 @@ class AffiliationFilter:
         
         for author in authors:
             if self.is_industry_affiliation(author) and author.affiliation:
-                company = self._extract_company_name(author.affiliation)
+                company = self._cached_company_names(author.affiliation)
                 if company:
                     companies.add(company)
         
@@ -270,11 +375,11 @@ class AffiliationFilter:
             Extracted company name
         """
         # Simple extraction - take the first part before comma or semicolon
-        parts = re.split(r'[,;]', affiliation)
+        parts = _AFFILIATION_SPLIT_RE.split(affiliation)
         if parts:
             company = parts[0].strip()
             # Remove common prefixes/suffixes
-            company = re.sub(r'^(department of|division of|section of)\s+', '', company, flags=re.IGNORECASE)
+            company = _UNIT_PREFIX_RE.sub('', company)
             return company
         
         return affiliation.strip()
@@ -2,8 +2,10 @@
 CSV output module for exporting filtered paper results.
 """
 
-import pandas as pd
-from typing import List, Optional
+import csv
+import io
+import itertools
+from typing import Iterable, Iterator, List, Optional, TextIO
 import os
 from .parser import Paper, Author
 from .filter import AffiliationFilter
@@ -12,15 +14,24 @@ from .filter import AffiliationFilter
 class CSVExporter:
     """Handles exporting paper data to CSV format."""
     
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, filter_obj: Optional[AffiliationFilter] = None):
         """
         Initialize CSV exporter.
         
         Args:
             debug: Whether to print debug information
+            filter_obj: Filter to classify authors with; sharing the caller's
+                filter reuses its memoized affiliation scores
         """
         self.debug = debug
-        self.filter = AffiliationFilter(debug=debug)
+        self.filter = filter_obj if filter_obj is not None else AffiliationFilter(debug=debug)
+
+    def _ensure_output_dir(self, output_file: str) -> None:
+        """Create the directory containing output_file if it does not exist."""
+        directory = os.path.dirname(output_file)
+        if directory:
+            # Checked on every export: the directory may be removed between runs
+            os.makedirs(directory, exist_ok=True)
     
     def export_papers(self, papers: List[Paper], output_file: str) -> None:
         """
@@ -38,29 +49,27 @@ class CSVExporter:
         csv_data = []
         
         for paper in papers:
-            # Identify industry authors for this paper
-            industry_authors = self.filter.identify_industry_authors(paper.authors)
+            # Identify industry authors and their companies in one pass
+            industry_authors, companies = self.filter.classify_authors(paper.authors)
             
             if industry_authors:  # Only include papers with industry authors
-                row_data = self._prepare_paper_row(paper, industry_authors)
+                row_data = self._prepare_paper_row(paper, industry_authors, companies)
                 csv_data.append(row_data)
         
         if not csv_data:
             print("No papers with industry authors found.")
             return
         
-        # Create DataFrame and export
-        df = pd.DataFrame(csv_data)
-        
         # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
+        self._ensure_output_dir(output_file)
         
         # Export to CSV
-        df.to_csv(output_file, index=False, encoding='utf-8')
+        with open(output_file, 'w', newline='', encoding='utf-8') as handle:
+            self._write_rows(handle, csv_data)
         
         if self.debug:
             print(f"Exported {len(csv_data)} papers to {output_file}")
-            print(f"Columns: {list(df.columns)}")
+            print(f"Columns: {list(csv_data[0])}")
 
     def export_all_papers(self, all_papers: List[Paper], papers_with_industry: List[Paper], output_file: str) -> None:
         """
@@ -82,36 +91,36 @@ class CSVExporter:
         csv_data = []
 
         for paper in all_papers:
-            # Identify industry authors for this paper
-            industry_authors = self.filter.identify_industry_authors(paper.authors)
+            # Identify industry authors and their companies in one pass
+            industry_authors, companies = self.filter.classify_authors(paper.authors)
             has_industry = paper.pubmed_id in industry_paper_ids
 
-            row_data = self._prepare_all_papers_row(paper, industry_authors, has_industry)
+            row_data = self._prepare_all_papers_row(paper, industry_authors, has_industry, companies)
             csv_data.append(row_data)
 
-        # Create DataFrame and export
-        df = pd.DataFrame(csv_data)
-
         # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
+        self._ensure_output_dir(output_file)
 
         # Export to CSV
-        df.to_csv(output_file, index=False, encoding='utf-8')
+        with open(output_file, 'w', newline='', encoding='utf-8') as handle:
+            self._write_rows(handle, csv_data)
 
         industry_count = len(papers_with_industry)
         total_count = len(all_papers)
 
         if self.debug:
             print(f"Exported {total_count} total papers to {output_file} ({industry_count} with industry authors)")
-            print(f"Columns: {list(df.columns)}")
+            print(f"Columns: {list(csv_data[0])}")
 
-    def _prepare_paper_row(self, paper: Paper, industry_authors: List[Author]) -> dict:
+    def _prepare_paper_row(self, paper: Paper, industry_authors: List[Author],
+                           companies: Optional[List[str]] = None) -> dict:
         """
         Prepare a single row of data for CSV export.
         
         Args:
             paper: Paper object
             industry_authors: List of industry-affiliated authors
+            companies: Company names already extracted for these authors
             
         Returns:
             Dictionary containing row data
@@ -119,8 +128,10 @@ class CSVExporter:
         # Format non-academic authors
         non_academic_authors = self._format_authors(industry_authors)
         
-        # Get company affiliations
-        company_affiliations = self.filter.get_company_affiliations(industry_authors)
+        # Get company affiliations (unless the caller already extracted them)
+        company_affiliations = companies
+        if company_affiliations is None:
+            company_affiliations = self.filter.get_company_affiliations(industry_authors)
         company_affiliations_str = "; ".join(company_affiliations)
         
         # Get corresponding author email
@@ -138,7 +149,8 @@ class CSVExporter:
             "Industry Authors Count": len(industry_authors)
         }
 
-    def _prepare_all_papers_row(self, paper: Paper, industry_authors: List[Author], has_industry: bool) -> dict:
+    def _prepare_all_papers_row(self, paper: Paper, industry_authors: List[Author], has_industry: bool,
+                                companies: Optional[List[str]] = None) -> dict:
         """
         Prepare a single row of data for all papers CSV export.
 
@@ -146,6 +158,7 @@ class CSVExporter:
             paper: Paper object
             industry_authors: List of industry-affiliated authors
             has_industry: Whether this paper has industry authors
+            companies: Company names already extracted for these authors
 
         Returns:
             Dictionary containing row data
@@ -153,8 +166,10 @@ class CSVExporter:
         # Format non-academic authors
         non_academic_authors = self._format_authors(industry_authors) if industry_authors else ""
 
-        # Get company affiliations
-        company_affiliations = self.filter.get_company_affiliations(industry_authors) if industry_authors else []
+        # Get company affiliations (unless the caller already extracted them)
+        company_affiliations = companies
+        if company_affiliations is None:
+            company_affiliations = self.filter.get_company_affiliations(industry_authors) if industry_authors else []
         company_affiliations_str = "; ".join(company_affiliations)
 
         # Find corresponding author email
@@ -177,6 +192,28 @@ class CSVExporter:
             "Industry Authors Count": len(industry_authors)
         }
 
+    @staticmethod
+    def _write_rows(handle: TextIO, rows: Iterable[dict]) -> None:
+        """
+        Write dict rows as CSV, using the first row's keys as the header.
+        
+        Args:
+            handle: Text stream to write to (opened with newline='')
+            rows: Non-empty iterable of row dictionaries with the same keys
+        """
+        rows = iter(rows)
+        first_row = next(rows)
+        writer = csv.DictWriter(handle, fieldnames=list(first_row), lineterminator='\n')
+        writer.writeheader()
+        writer.writerow(first_row)
+        writer.writerows(rows)
+
+    def _format_rows(self, rows: List[dict]) -> str:
+        """Render dict rows as a CSV string for console output."""
+        buffer = io.StringIO()
+        self._write_rows(buffer, rows)
+        return buffer.getvalue()
+
     def _format_authors(self, authors: List[Author]) -> str:
         """
         Format author list for CSV output.
@@ -217,25 +254,22 @@ class CSVExporter:
         csv_data = []
 
         for paper in papers:
-            # Identify industry authors for this paper
-            industry_authors = self.filter.identify_industry_authors(paper.authors)
+            # Identify industry authors and their companies in one pass
+            industry_authors, companies = self.filter.classify_authors(paper.authors)
 
             if industry_authors:  # Only include papers with industry authors
-                row_data = self._prepare_paper_row(paper, industry_authors)
+                row_data = self._prepare_paper_row(paper, industry_authors, companies)
                 csv_data.append(row_data)
 
         if not csv_data:
             print("No papers with industry authors found.")
             return
 
-        # Create DataFrame and print to console
-        df = pd.DataFrame(csv_data)
-
         # Print CSV header and data
         print("\n" + "="*80)
         print("RESULTS (CSV FORMAT)")
         print("="*80)
-        print(df.to_csv(index=False, encoding='utf-8'))
+        print(self._format_rows(csv_data))
 
         if self.debug:
             print(f"Displayed {len(csv_data)} papers to console")
@@ -259,21 +293,18 @@ class CSVExporter:
         csv_data = []
 
         for paper in all_papers:
-            # Identify industry authors for this paper
-            industry_authors = self.filter.identify_industry_authors(paper.authors)
+            # Identify industry authors and their companies in one pass
+            industry_authors, companies = self.filter.classify_authors(paper.authors)
             has_industry = paper.pubmed_id in industry_paper_ids
 
-            row_data = self._prepare_all_papers_row(paper, industry_authors, has_industry)
+            row_data = self._prepare_all_papers_row(paper, industry_authors, has_industry, companies)
             csv_data.append(row_data)
 
-        # Create DataFrame and print to console
-        df = pd.DataFrame(csv_data)
-
         # Print CSV header and data
         print("\n" + "="*80)
         print("ALL PAPERS RESULTS (CSV FORMAT)")
         print("="*80)
-        print(df.to_csv(index=False, encoding='utf-8'))
+        print(self._format_rows(csv_data))
 
         industry_count = len(papers_with_industry)
         total_count = len(all_papers)
@@ -314,38 +345,47 @@ class CSVExporter:
             papers: List of Paper objects
             output_file: Path to output file
         """
-        detailed_data = []
-        
-        for paper in papers:
-            industry_authors = self.filter.identify_industry_authors(paper.authors)
-            
-            if industry_authors:
-                for author in industry_authors:
-                    row = {
-                        "PubmedID": paper.pubmed_id,
-                        "Title": paper.title,
-                        "Publication Date": paper.publication_date,
-                        "Journal": paper.journal,
-                        "Author Last Name": author.last_name,
-                        "Author First Name": author.first_name,
-                        "Author Initials": author.initials,
-                        "Author Email": author.email or "",
-                        "Author Affiliation": author.affiliation,
-                        "Corresponding Author Email": paper.corresponding_author_email or "",
-                        "Abstract": paper.abstract[:500] + "..." if len(paper.abstract) > 500 else paper.abstract
-                    }
-                    detailed_data.append(row)
+        # Rows are streamed to the file rather than collected first
+        rows = self._iter_detailed_rows(papers)
+        first_row = next(rows, None)
         
-        if detailed_data:
-            df = pd.DataFrame(detailed_data)
-            
+        if first_row is not None:
             # Create detailed report filename
             base_name = os.path.splitext(output_file)[0]
             detailed_file = f"{base_name}_detailed.csv"
             
-            df.to_csv(detailed_file, index=False, encoding='utf-8')
+            with open(detailed_file, 'w', newline='', encoding='utf-8') as handle:
+                self._write_rows(handle, itertools.chain([first_row], rows))
             
             if self.debug:
                 print(f"Exported detailed report to {detailed_file}")
         else:
             print("No detailed data to export.")
+
+    def _iter_detailed_rows(self, papers: List[Paper]) -> Iterator[dict]:
+        """
+        Yield one detailed report row per industry author.
+        
+        Args:
+            papers: List of Paper objects
+            
+        Yields:
+            Dictionary containing row data
+        """
+        for paper in papers:
+            industry_authors = self.filter.identify_industry_authors(paper.authors)
+            
+            for author in industry_authors:
+                yield {
+                    "PubmedID": paper.pubmed_id,
+                    "Title": paper.title,
+                    "Publication Date": paper.publication_date,
+                    "Journal": paper.journal,
+                    "Author Last Name": author.last_name,
+                    "Author First Name": author.first_name,
+                    "Author Initials": author.initials,
+                    "Author Email": author.email or "",
+                    "Author Affiliation": author.affiliation,
+                    "Corresponding Author Email": paper.corresponding_author_email or "",
+                    "Abstract": paper.abstract[:500] + "..." if len(paper.abstract) > 500 else paper.abstract
+                }
@@ -2,12 +2,29 @@
 XML parsing module for PubMed paper data.
 """
 
-from typing import List, Dict, Optional
+import io
+import logging
+from functools import cached_property
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 from lxml import etree
 import re
 
 
+logger = logging.getLogger(__name__)
+
+# Patterns used on every parsed author and field, compiled once
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# PubMed dates may spell out the month ("Mar", "March")
+_MONTH_MAP = {
+    'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
+    'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
+    'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
+}
+
+
 @dataclass
 class Author:
     """Represents an author with their affiliation information."""
@@ -17,6 +34,21 @@ class Author:
     affiliation: str
     email: Optional[str] = None
 
+    @cached_property
+    def affiliation_normalized(self) -> str:
+        """Lowercased affiliation used for keyword matching, computed once per author."""
+        return self.affiliation.lower() if self.affiliation else ""
+
+    @cached_property
+    def email_normalized(self) -> str:
+        """Lowercased email used for domain scoring, computed once per author."""
+        return self.email.lower() if self.email else ""
+
+    @cached_property
+    def display_name(self) -> str:
+        """"Last, First" (or initials) as shown in results and previews."""
+        return f"{self.last_name}, {self.first_name or self.initials}"
+
 
 @dataclass
 class Paper:
@@ -32,6 +64,26 @@ class Paper:
 
 class PubMedParser:
     """Parses XML responses from PubMed API."""
+
+    # Compiled once; child-axis paths avoid a descendant scan per field
+    _XP_PMID = etree.XPath('./MedlineCitation/PMID/text()')
+    # Titles and abstracts may contain inline markup (<i>, <sup>, ...), so
+    # their full text is taken rather than the first text node
+    _XP_TITLE = etree.XPath('string(./MedlineCitation/Article/ArticleTitle)')
+    _XP_JOURNAL = etree.XPath('./MedlineCitation/Article/Journal/Title/text()')
+    _XP_ABSTRACT = etree.XPath('./MedlineCitation/Article/Abstract/AbstractText')
+    _XP_AUTHORS = etree.XPath('./MedlineCitation/Article/AuthorList/Author')
+    _XP_LAST_NAME = etree.XPath('./LastName/text()')
+    _XP_FORE_NAME = etree.XPath('./ForeName/text()')
+    _XP_INITIALS = etree.XPath('./Initials/text()')
+    _XP_AFFILIATION = etree.XPath('./AffiliationInfo/Affiliation/text()')
+    # Kept separate rather than as one union: DateCompleted precedes Article
+    # in document order, but the journal PubDate is preferred
+    _XP_DATES = (
+        etree.XPath('./MedlineCitation/Article/Journal/JournalIssue/PubDate'),
+        etree.XPath('./MedlineCitation/Article/ArticleDate'),
+        etree.XPath('./MedlineCitation/DateCompleted'),
+    )
     
     def parse_papers(self, xml_content: str) -> List[Paper]:
         """
@@ -43,53 +95,82 @@ class PubMedParser:
         Returns:
             List of Paper objects
         """
-        papers = []
+        return list(self.iter_papers(xml_content))
+
+    def parse_papers_bulk(self, xml_responses: Iterable[Union[str, bytes]]) -> List[Paper]:
+        """
+        Parse several efetch responses (e.g. from fetch_papers_batch) in one go.
+
+        Responses are consumed lazily, so a generator of batches is parsed
+        while later batches are still being fetched.
         
-        try:
-            root = etree.fromstring(xml_content.encode('utf-8'))
+        Args:
+            xml_responses: XML responses from PubMed efetch API
             
-            # Find all PubmedArticle elements
-            articles = root.xpath('//PubmedArticle')
+        Returns:
+            List of Paper objects from all responses, in order
+        """
+        return [paper for xml_content in xml_responses for paper in self.iter_papers(xml_content)]
+
+    def iter_papers(self, xml_content: Union[str, bytes]) -> Iterator[Paper]:
+        """
+        Stream-parse XML content, yielding papers one article at a time.
+
+        Each PubmedArticle element is discarded once it has been turned into
+        a Paper, so memory stays bounded by a single article rather than the
+        whole efetch response tree.
+        
+        Args:
+            xml_content: XML response from PubMed efetch API
             
-            for article in articles:
+        Yields:
+            Paper objects in document order
+        """
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode('utf-8')
+
+        try:
+            for _, article in etree.iterparse(io.BytesIO(xml_content), tag='PubmedArticle'):
                 paper = self._parse_single_paper(article)
+
+                # Free the parsed article and any already-processed siblings
+                article.clear()
+                while article.getprevious() is not None:
+                    del article.getparent()[0]
+
                 if paper:
-                    papers.append(paper)
+                    yield paper
                     
         except etree.XMLSyntaxError as e:
             raise Exception(f"Error parsing XML: {e}")
         except Exception as e:
             raise Exception(f"Error processing papers: {e}")
-        
-        return papers
     
     def _parse_single_paper(self, article_element) -> Optional[Paper]:
         """Parse a single PubmedArticle element."""
         try:
             # Extract PubMed ID
-            pubmed_id = self._get_text(article_element, './/PMID')
+            pubmed_id = self._first_text(self._XP_PMID(article_element))
             if not pubmed_id:
                 return None
             
             # Extract title
-            title = self._get_text(article_element, './/ArticleTitle')
-            title = self._clean_text(title)
+            title = self._clean_text(self._XP_TITLE(article_element))
             
             # Extract publication date
             pub_date = self._extract_publication_date(article_element)
             
             # Extract journal
-            journal = self._get_text(article_element, './/Journal/Title')
+            journal = self._first_text(self._XP_JOURNAL(article_element))
             
-            # Extract abstract
-            abstract = self._get_text(article_element, './/Abstract/AbstractText')
+            # Extract abstract (structured abstracts have one section per AbstractText)
+            abstract = ' '.join(
+                ''.join(section.itertext()) for section in self._XP_ABSTRACT(article_element)
+            )
             abstract = self._clean_text(abstract)
             
-            # Extract authors
-            authors = self._extract_authors(article_element)
-            
-            # Find corresponding author email
-            corresponding_email = self._find_corresponding_author_email(authors)
+            # Extract authors and the corresponding author email
+            authors, corresponding_email = self._extract_authors(article_element)
             
             return Paper(
                 pubmed_id=pubmed_id,
@@ -102,25 +183,32 @@ class PubMedParser:
             )
             
         except Exception as e:
-            print(f"Warning: Error parsing paper: {e}")
+            logger.warning("Error parsing paper: %s", e)
             return None
     
-    def _extract_authors(self, article_element) -> List[Author]:
-        """Extract author information from the article."""
-        authors = []
+    def _extract_authors(self, article_element) -> Tuple[List[Author], Optional[str]]:
+        """
+        Extract author information from the article.
         
-        author_elements = article_element.xpath('.//AuthorList/Author')
+        Returns:
+            The authors, and the first email found among them (taken as the
+            corresponding author's)
+        """
+        authors = []
+        corresponding_email = None
         
-        for author_elem in author_elements:
-            last_name = self._get_text(author_elem, './LastName', '')
-            first_name = self._get_text(author_elem, './ForeName', '')
-            initials = self._get_text(author_elem, './Initials', '')
+        for author_elem in self._XP_AUTHORS(article_element):
+            last_name = self._first_text(self._XP_LAST_NAME(author_elem))
+            first_name = self._first_text(self._XP_FORE_NAME(author_elem))
+            initials = self._first_text(self._XP_INITIALS(author_elem))
             
             # Extract affiliation
-            affiliation = self._get_text(author_elem, './AffiliationInfo/Affiliation', '')
+            affiliation = self._first_text(self._XP_AFFILIATION(author_elem))
             
             # Look for email in affiliation text
             email = self._extract_email_from_text(affiliation)
+            if corresponding_email is None and email:
+                corresponding_email = email
             
             author = Author(
                 last_name=last_name,
@@ -132,23 +220,17 @@ class PubMedParser:
             
             authors.append(author)
         
-        return authors
+        return authors, corresponding_email
     
     def _extract_publication_date(self, article_element) -> str:
         """Extract publication date in YYYY-MM-DD format."""
-        # Try different date elements
-        date_elements = [
-            './/PubDate',
-            './/ArticleDate',
-            './/DateCompleted'
-        ]
-        
-        for date_xpath in date_elements:
-            date_elem = article_element.xpath(date_xpath)
+        # Try the date elements in order of preference
+        for date_xpath in self._XP_DATES:
+            date_elem = date_xpath(article_element)
             if date_elem:
-                year = self._get_text(date_elem[0], './Year', '')
-                month = self._get_text(date_elem[0], './Month', '01')
-                day = self._get_text(date_elem[0], './Day', '01')
+                year = self._child_text(date_elem[0], 'Year', '')
+                month = self._child_text(date_elem[0], 'Month', '01')
+                day = self._child_text(date_elem[0], 'Day', '01')
                 
                 # Handle month names
                 month = self._convert_month_name_to_number(month)
@@ -160,41 +242,28 @@ class PubMedParser:
     
     def _convert_month_name_to_number(self, month: str) -> str:
         """Convert month name to number."""
-        month_map = {
-            'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
-            'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
-            'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
-        }
-        
-        month_lower = month.lower()[:3]
-        return month_map.get(month_lower, month)
+        return _MONTH_MAP.get(month[:3].lower(), month)
     
     def _extract_email_from_text(self, text: str) -> Optional[str]:
         """Extract email address from text using regex."""
-        if not text:
+        # Most affiliations carry no email; a substring test is far cheaper than the regex
+        if not text or '@' not in text:
             return None
             
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        matches = re.findall(email_pattern, text)
-        
-        return matches[0] if matches else None
+        match = _EMAIL_RE.search(text)
+        return match.group(0) if match else None
     
-    def _find_corresponding_author_email(self, authors: List[Author]) -> Optional[str]:
-        """Find the corresponding author's email."""
-        for author in authors:
-            if author.email:
-                return author.email
-        return None
+    @staticmethod
+    def _first_text(texts: List[str], default: str = '') -> str:
+        """Return the first result of a compiled text() XPath, stripped."""
+        if texts:
+            return texts[0].strip()
+        return default
     
-    def _get_text(self, element, xpath: str, default: str = '') -> str:
-        """Safely extract text from XML element."""
-        try:
-            result = element.xpath(xpath)
-            if result and hasattr(result[0], 'text') and result[0].text:
-                return result[0].text.strip()
-            return default
-        except:
-            return default
+    @staticmethod
+    def _child_text(element, tag: str, default: str = '') -> str:
+        """Return the stripped text of a direct child element, or default."""
+        return (element.findtext(tag) or '').strip() or default
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text content."""
@@ -202,7 +271,4 @@ class PubMedParser:
             return ""
         
         # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
-        
-        return text
+        return _WHITESPACE_RE.sub(' ', text).strip()
@@ -2,26 +2,109 @@
 """
 Integration tests for the command-line interface.
 Validates CLI functionality and user interaction.
+
+Most tests invoke the command in this process through Typer's CliRunner,
+with the PubMed HTTP calls answered from canned data, so they need no
+network. test_required_arguments still runs cli.py as a subprocess to cover
+the script entry point end to end.
 """
 
+import re
 import subprocess
 import sys
 import os
 import tempfile
 import time
 from pathlib import Path
+from unittest.mock import Mock, patch
+
+import typer
+from typer.testing import CliRunner
+
+_CWD = os.path.dirname(os.path.abspath(__file__))
+_PY = sys.executable
+
+# Add the current directory to the path
+sys.path.insert(0, _CWD)
+
+from cli import search_papers
+from paper_finder.fetch import PubMedFetcher
+
+# Same wiring as typer.run() in cli.main, but reusable across invocations
+_app = typer.Typer(add_completion=False)
+_app.command()(search_papers)
+_runner = CliRunner()
+
+# Keep test CSV writes in RAM where a writable tmpfs is available (Linux)
+_TEMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# One directory for the whole run; each test writes its own file name into it
+_TEMP_DIR = tempfile.TemporaryDirectory(dir=_TEMP_ROOT)
+
+# Canned E-utilities data served in place of PubMed
+_FAKE_PUBMED_IDS = ["12345", "67890"]
+_NO_RESULTS_QUERY = "xyznonexistentquery12345abcdef"
+_FAKE_ARTICLE_XML = (
+    "<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>"
+    "<ArticleTitle>Test paper {pmid}</ArticleTitle>"
+    "<Journal><JournalIssue><PubDate><Year>2024</Year><Month>Jan</Month></PubDate>"
+    "</JournalIssue></Journal><AuthorList>"
+    "<Author><LastName>Smith</LastName><ForeName>John</ForeName><AffiliationInfo>"
+    "<Affiliation>Pfizer Inc., New York, USA. john.smith@pfizer.com</Affiliation>"
+    "</AffiliationInfo></Author>"
+    "<Author><LastName>Doe</LastName><ForeName>Jane</ForeName><AffiliationInfo>"
+    "<Affiliation>Department of Biology, Harvard University, Cambridge, USA</Affiliation>"
+    "</AffiliationInfo></Author>"
+    "</AuthorList></Article></MedlineCitation></PubmedArticle>"
+)
+
+
+# Output markers test_all_options expects, matched by one precompiled scanner
+_EXPECTED_MARKERS = (
+    "PubMed Paper Finder",
+    "Query: test",
+    "Max results: 2",
+    "Debug mode enabled"
+)
+_EXPECTED_MARKERS_RE = re.compile("|".join(map(re.escape, _EXPECTED_MARKERS)))
+
+
+def _fake_pubmed_get(url, params=None, **kwargs):
+    """Answer esearch/efetch requests from the canned data above."""
+    response = Mock(status_code=200)
+    response.raise_for_status.return_value = None
+    if url.endswith("/esearch.fcgi"):
+        ids = [] if params["term"] == _NO_RESULTS_QUERY else _FAKE_PUBMED_IDS
+        response.json.return_value = {"esearchresult": {"idlist": ids[:int(params["retmax"])]}}
+    else:
+        articles = "".join(_FAKE_ARTICLE_XML.format(pmid=pmid) for pmid in params["id"].split(","))
+        response.content = f"<PubmedArticleSet>{articles}</PubmedArticleSet>".encode("utf-8")
+    return response
+
+
+def invoke_cli(args):
+    """Run the CLI in this process against the fake PubMed and return (exit code, output)."""
+    with patch("paper_finder.fetch.requests.Session.get", side_effect=_fake_pubmed_get), \
+            patch.object(PubMedFetcher, "_shared_rate_limiter", return_value=Mock()):
+        result = _runner.invoke(_app, args)
+    return result.exit_code, result.output
 
 
-def run_command(cmd, timeout=30):
-    """Run a command and return result."""
+def _output_tail(output, length=200):
+    """End of the CLI output on one line (Rich wraps it), for failure messages."""
+    return " ".join(output.split())[-length:]
+
+
+def run_command(argv, timeout=30):
+    """Run cli.py with the given arguments in a child interpreter and return result."""
     try:
         result = subprocess.run(
-            cmd, 
-            shell=True, 
-            capture_output=True, 
-            text=True, 
+            [_PY, "cli.py", *argv],
+            shell=False,
+            capture_output=True,
+            text=True,
             timeout=timeout,
-            cwd=os.path.dirname(os.path.abspath(__file__))
+            cwd=_CWD
         )
         return result.returncode, result.stdout, result.stderr
     except subprocess.TimeoutExpired:
@@ -32,17 +115,21 @@ def test_help_option():
     """Test --help option."""
     print("Testing --help option...")
     
-    # Test both -h and --help
-    for help_flag in ["-h", "--help"]:
-        returncode, stdout, stderr = run_command(f"python cli.py {help_flag}")
-        
-        if returncode != 0:
-            print(f"[FAIL] Help option {help_flag} failed")
-            return False
-        
-        if "Usage:" not in stdout or "Options:" not in stdout:
-            print(f"[FAIL] Help output missing required sections for {help_flag}")
-            return False
+    returncode, stdout = invoke_cli(["--help"])
+    
+    if returncode != 0:
+        print("[FAIL] Help option --help failed")
+        return False
+    
+    if "Usage:" not in stdout or "Options:" not in stdout:
+        print("[FAIL] Help output missing required sections for --help")
+        return False
+    
+    # -h is bound to the same option, so checking the declaration is enough
+    help_params = [param for param in typer.main.get_command(_app).params if param.name == "help_flag"]
+    if not help_params or "-h" not in help_params[0].opts:
+        print("[FAIL] Help option -h is not declared")
+        return False
     
     print("[PASS] Help option works correctly")
     return True
@@ -52,7 +139,7 @@ def test_required_arguments():
     """Test that query argument is required."""
     print("Testing required arguments...")
     
-    returncode, stdout, stderr = run_command("python cli.py")
+    returncode, stdout, stderr = run_command([])
     
     if returncode == 0:
         print("[FAIL] CLI should fail when no query provided")
@@ -70,21 +157,19 @@ def test_basic_functionality():
     """Test basic CLI functionality with a simple query."""
     print("Testing basic functionality...")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        output_file = os.path.join(temp_dir, "test_output.csv")
-        
-        # Test with file output
-        cmd = f'python cli.py "test" --max-results 1 --file "{output_file}"'
-        returncode, stdout, stderr = run_command(cmd, timeout=60)
-        
-        if returncode != 0:
-            print(f"[FAIL] Basic functionality test failed: {stderr}")
-            return False
+    output_file = os.path.join(_TEMP_DIR.name, "test_output.csv")
+    
+    # Test with file output
+    returncode, stdout = invoke_cli(["test", "--max-results", "1", "--file", output_file])
+    
+    if returncode != 0:
+        print(f"[FAIL] Basic functionality test failed: {_output_tail(stdout)}")
+        return False
 
-        # Check if output mentions the process
-        if "PubMed Paper Finder" not in stdout:
-            print("[FAIL] Missing expected output format")
-            return False
+    # Check if output mentions the process
+    if "PubMed Paper Finder" not in stdout:
+        print("[FAIL] Missing expected output format")
+        return False
 
     print("[PASS] Basic functionality works")
     return True
@@ -94,11 +179,10 @@ def test_console_output():
     """Test console output when no file specified."""
     print("Testing console output...")
     
-    cmd = 'python cli.py "test" --max-results 1'
-    returncode, stdout, stderr = run_command(cmd, timeout=60)
+    returncode, stdout = invoke_cli(["test", "--max-results", "1"])
     
     if returncode != 0:
-        print(f"[FAIL] Console output test failed: {stderr}")
+        print(f"[FAIL] Console output test failed: {_output_tail(stdout)}")
         return False
 
     if "Output: Console" not in stdout:
@@ -113,11 +197,10 @@ def test_debug_mode():
     """Test debug mode functionality."""
     print("Testing debug mode...")
     
-    cmd = 'python cli.py "test" --debug --max-results 1'
-    returncode, stdout, stderr = run_command(cmd, timeout=60)
+    returncode, stdout = invoke_cli(["test", "--debug", "--max-results", "1"])
     
     if returncode != 0:
-        print(f"[FAIL] Debug mode test failed: {stderr}")
+        print(f"[FAIL] Debug mode test failed: {_output_tail(stdout)}")
         return False
 
     if "Debug mode enabled" not in stdout:
@@ -132,28 +215,23 @@ def test_all_options():
     """Test CLI with all options."""
     print("Testing all CLI options...")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        output_file = os.path.join(temp_dir, "full_test.csv")
-        
-        cmd = f'python cli.py "test" --file "{output_file}" --max-results 2 --debug --email "test@example.com" --detailed'
-        returncode, stdout, stderr = run_command(cmd, timeout=60)
-        
-        if returncode != 0:
-            print(f"[FAIL] Full options test failed: {stderr}")
-            return False
-
-        # Check for expected output elements
-        expected_elements = [
-            "PubMed Paper Finder",
-            "Query: test",
-            "Max results: 2",
-            "Debug mode enabled"
-        ]
+    output_file = os.path.join(_TEMP_DIR.name, "full_test.csv")
+    
+    returncode, stdout = invoke_cli([
+        "test", "--file", output_file, "--max-results", "2",
+        "--debug", "--email", "test@example.com", "--detailed"
+    ])
+    
+    if returncode != 0:
+        print(f"[FAIL] Full options test failed: {_output_tail(stdout)}")
+        return False
 
-        for element in expected_elements:
-            if element not in stdout:
-                print(f"[FAIL] Missing expected element: {element}")
-                return False
+    # Check for expected output elements, in one pass over the output
+    found = set(_EXPECTED_MARKERS_RE.findall(stdout))
+    for element in _EXPECTED_MARKERS:
+        if element not in found:
+            print(f"[FAIL] Missing expected element: {element}")
+            return False
 
     print("[PASS] All options work correctly")
     return True
@@ -164,18 +242,26 @@ def test_error_handling():
     print("Testing error handling...")
     
     # Test with very long nonsense query that should return no results
-    cmd = 'python cli.py "xyznonexistentquery12345abcdef" --max-results 1'
-    returncode, stdout, stderr = run_command(cmd, timeout=60)
+    returncode, stdout = invoke_cli([_NO_RESULTS_QUERY, "--max-results", "1"])
     
     # Should complete successfully even with no results
     if returncode not in [0, 1]:  # Allow exit code 1 for no results
-        print(f"[FAIL] Error handling test failed unexpectedly: {stderr}")
+        print(f"[FAIL] Error handling test failed unexpectedly: {_output_tail(stdout)}")
         return False
 
     print("[PASS] Error handling works")
     return True
 
 
+def _run_one(test):
+    """Run one test, returning (name, passed) instead of raising."""
+    try:
+        return test.__name__, bool(test())
+    except Exception as e:
+        print(f"[FAIL] Test {test.__name__} crashed: {e}")
+        return test.__name__, False
+
+
 def main():
     """Run all CLI tests."""
     print("=" * 60)
@@ -195,14 +281,13 @@ def main():
     passed = 0
     total = len(tests)
     
+    # In-process tests swap sys.stdout while they run, so they run one at a time
     for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                print(f"[FAIL] Test {test.__name__} failed")
-        except Exception as e:
-            print(f"[FAIL] Test {test.__name__} crashed: {e}")
+        name, ok = _run_one(test)
+        if ok:
+            passed += 1
+        else:
+            print(f"[FAIL] Test {name} failed")
 
         print("-" * 40)
 
@@ -4,33 +4,48 @@ Unit tests for the PubMed Paper Finder.
 Tests core functionality including API integration, parsing, and filtering.
 """
 
+import csv
 import unittest
 import tempfile
 import os
 import sys
 from unittest.mock import Mock, patch, MagicMock
-import pandas as pd
+import requests
 
 # Add the current directory to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from paper_finder.fetch import PubMedFetcher
+from paper_finder.cache import ResponseCache
 from paper_finder.parser import PubMedParser, Paper, Author
 from paper_finder.filter import AffiliationFilter
 from paper_finder.output import CSVExporter
 
+# Keep test CSV writes in RAM where a writable tmpfs is available (Linux)
+_TEMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
 
 class TestPubMedFetcher(unittest.TestCase):
     """Test PubMed API fetching functionality."""
     
-    def setUp(self):
-        self.fetcher = PubMedFetcher(email="test@example.com")
+    @classmethod
+    def setUpClass(cls):
+        cls.fetcher = PubMedFetcher(email="test@example.com")
     
     def test_init(self):
         """Test fetcher initialization."""
         self.assertEqual(self.fetcher.email, "test@example.com")
         self.assertEqual(self.fetcher.tool, "get-papers-list")
-    
+
+    def test_session_retries_throttled_requests(self):
+        """Test that the shared session retries 429 responses."""
+        adapter = self.fetcher.session.get_adapter(PubMedFetcher.BASE_URL)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+
+    def test_session_requests_compressed_responses(self):
+        """Test that efetch responses are requested gzip-compressed."""
+        self.assertIn("gzip", self.fetcher.session.headers["Accept-Encoding"])
+
     @patch('paper_finder.fetch.requests.Session.get')
     def test_search_papers_success(self, mock_get):
         """Test successful paper search."""
@@ -56,21 +71,167 @@ class TestPubMedFetcher(unittest.TestCase):
         mock_get.return_value = mock_response
         
         result = self.fetcher.search_papers("nonexistent query")
-        
+
         self.assertEqual(result, [])
 
+    def test_api_key_sent_with_requests(self):
+        """Test that the API key is included in request parameters."""
+        fetcher = PubMedFetcher(email="test@example.com", api_key="secret")
+        self.assertEqual(fetcher._get_common_params()["api_key"], "secret")
+
+    def test_fetchers_share_rate_limiter(self):
+        """Test that fetchers using the same API key share one rate limit."""
+        keyed = PubMedFetcher(api_key="secret")
+        self.assertIs(keyed._rate_limiter, PubMedFetcher(api_key="secret")._rate_limiter)
+        self.assertIs(self.fetcher._rate_limiter, PubMedFetcher()._rate_limiter)
+        self.assertIsNot(keyed._rate_limiter, self.fetcher._rate_limiter)
+
+    @patch.object(PubMedFetcher, 'fetch_paper_details')
+    def test_fetch_papers_batch_preserves_order(self, mock_fetch):
+        """Test that concurrently fetched batches come back in batch order."""
+        mock_fetch.side_effect = lambda ids: f"<xml>{ids[0]}</xml>".encode("utf-8")
+        pubmed_ids = [str(i) for i in range(5)]
+
+        result = self.fetcher.fetch_papers_batch(pubmed_ids, batch_size=2)
+
+        self.assertEqual(result, [b"<xml>0</xml>", b"<xml>2</xml>", b"<xml>4</xml>"])
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test caching of E-utilities responses."""
+
+    def setUp(self):
+        self.cache = ResponseCache(path=":memory:", ttl=3600)
+        self.fetcher = PubMedFetcher(email="test@example.com", cache=self.cache)
+
+    def _response(self, status_code=200, content=b"<PubmedArticleSet/>", headers=None):
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = content
+        response.encoding = "utf-8"
+        response.headers.update(headers or {})
+        return response
+
+    @patch('paper_finder.fetch.requests.Session.get')
+    def test_fresh_entry_skips_network(self, mock_get):
+        """Test that a fresh cached response is served without a request."""
+        mock_get.return_value = self._response(content=b"<xml>1</xml>")
+
+        first = self.fetcher.fetch_paper_details(["12345"])
+        second = self.fetcher.fetch_paper_details(["12345"])
+
+        self.assertEqual(first, b"<xml>1</xml>")
+        self.assertEqual(second, first)
+        mock_get.assert_called_once()
+
+    @patch('paper_finder.fetch.requests.Session.get')
+    def test_stale_entry_revalidated_with_etag(self, mock_get):
+        """Test that a stale entry is revalidated and reused on 304."""
+        self.cache.ttl = 0
+        mock_get.side_effect = [
+            self._response(content=b"<xml>1</xml>", headers={"ETag": '"abc"'}),
+            self._response(status_code=304, content=b"")
+        ]
+
+        self.fetcher.fetch_paper_details(["12345"])
+        result = self.fetcher.fetch_paper_details(["12345"])
+
+        self.assertEqual(result, b"<xml>1</xml>")
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"If-None-Match": '"abc"'})
+
+    def test_old_entries_evicted_on_write(self):
+        """Test that entries past max_age are deleted when a new one is stored."""
+        self.cache.max_age = 60
+        self.cache.set("old", self._response())
+        with self.cache._lock:
+            self.cache._connection().execute("UPDATE responses SET stored_at = stored_at - 120")
+
+        self.cache.set("new", self._response())
+
+        self.assertIsNone(self.cache.get("old"))
+        self.assertIsNotNone(self.cache.get("new"))
+
 
 class TestPubMedParser(unittest.TestCase):
     """Test XML parsing functionality."""
     
-    def setUp(self):
-        self.parser = PubMedParser()
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = PubMedParser()
     
     def test_parse_empty_xml(self):
         """Test parsing empty XML."""
         result = self.parser.parse_papers("<PubmedArticleSet></PubmedArticleSet>")
         self.assertEqual(result, [])
-    
+
+    def test_iter_papers_streams_articles(self):
+        """Test that papers are yielded one article at a time."""
+        xml_content = (
+            "<PubmedArticleSet>"
+            "<PubmedArticle><MedlineCitation><PMID>1</PMID><Article>"
+            "<ArticleTitle>First</ArticleTitle><AuthorList><Author>"
+            "<LastName>Smith</LastName><AffiliationInfo><Affiliation>Pfizer Inc.</Affiliation>"
+            "</AffiliationInfo></Author></AuthorList></Article></MedlineCitation></PubmedArticle>"
+            "<PubmedArticle><MedlineCitation><PMID>2</PMID><Article>"
+            "<ArticleTitle>Second</ArticleTitle></Article></MedlineCitation></PubmedArticle>"
+            "</PubmedArticleSet>"
+        )
+
+        papers = self.parser.iter_papers(xml_content)
+        first = next(papers)
+
+        self.assertEqual(first.pubmed_id, "1")
+        self.assertEqual(first.authors[0].affiliation, "Pfizer Inc.")
+        self.assertEqual([paper.title for paper in papers], ["Second"])
+
+    def test_parse_papers_bulk_keeps_batch_order(self):
+        """Test that papers from several responses come back in order."""
+        batches = [
+            f"<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>{pmid}</PMID>"
+            "</MedlineCitation></PubmedArticle></PubmedArticleSet>"
+            for pmid in ("1", "2")
+        ]
+
+        papers = self.parser.parse_papers_bulk(iter(batches))
+
+        self.assertEqual([paper.pubmed_id for paper in papers], ["1", "2"])
+
+    def test_title_and_abstract_keep_inline_markup_text(self):
+        """Test that inline markup and structured abstract sections are kept."""
+        xml_content = (
+            "<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>1</PMID><Article>"
+            "<ArticleTitle><i>E. coli</i> response to stress</ArticleTitle>"
+            "<Abstract><AbstractText Label=\"BACKGROUND\">Cells <sup>adapt</sup>.</AbstractText>"
+            "<AbstractText Label=\"RESULTS\">It works.</AbstractText></Abstract>"
+            "</Article></MedlineCitation></PubmedArticle></PubmedArticleSet>"
+        )
+
+        paper = self.parser.parse_papers(xml_content)[0]
+
+        self.assertEqual(paper.title, "E. coli response to stress")
+        self.assertEqual(paper.abstract, "Cells adapt. It works.")
+
+    def test_publication_date_prefers_journal_pub_date(self):
+        """Test that PubDate wins over DateCompleted and a yearless date is skipped."""
+        xml_content = (
+            "<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>{pmid}</PMID>"
+            "<DateCompleted><Year>2023</Year><Month>05</Month><Day>02</Day></DateCompleted>"
+            "<Article><Journal><JournalIssue><PubDate>{pub_date}</PubDate></JournalIssue></Journal>"
+            "</Article></MedlineCitation></PubmedArticle></PubmedArticleSet>"
+        )
+
+        papers = self.parser.parse_papers_bulk([
+            xml_content.format(pmid="1", pub_date="<Year>2024</Year><Month>Mar</Month><Day>7</Day>"),
+            xml_content.format(pmid="2", pub_date="<MedlineDate>2024 Spring</MedlineDate>"),
+        ])
+
+        self.assertEqual([paper.publication_date for paper in papers], ["2024-03-07", "2023-05-02"])
+
+    def test_extract_email_stops_at_pipe(self):
+        """Test that a '|' is not taken as part of the top-level domain."""
+        email = self.parser._extract_email_from_text("Pfizer Inc. john@pfizer.co|m")
+        self.assertEqual(email, "john@pfizer.co")
+
     def test_author_creation(self):
         """Test Author dataclass creation."""
         author = Author(
@@ -83,7 +244,19 @@ class TestPubMedParser(unittest.TestCase):
         
         self.assertEqual(author.last_name, "Smith")
         self.assertEqual(author.email, "john@test.edu")
-    
+
+    def test_author_display_name(self):
+        """Test that display names fall back to initials."""
+        author = Author(last_name="Smith", first_name="", initials="J", affiliation="")
+        self.assertEqual(author.display_name, "Smith, J")
+
+    def test_author_normalized_fields(self):
+        """Test that affiliation and email are lowercased for matching."""
+        author = Author("Smith", "John", "J", "Pfizer Inc.", "John.Smith@Pfizer.COM")
+        self.assertEqual(author.affiliation_normalized, "pfizer inc.")
+        self.assertEqual(author.email_normalized, "john.smith@pfizer.com")
+        self.assertEqual(Author("Doe", "", "", "").email_normalized, "")
+
     def test_paper_creation(self):
         """Test Paper dataclass creation."""
         authors = [Author("Smith", "John", "J", "Test University")]
@@ -102,8 +275,9 @@ class TestPubMedParser(unittest.TestCase):
 class TestAffiliationFilter(unittest.TestCase):
     """Test author affiliation filtering."""
     
-    def setUp(self):
-        self.filter = AffiliationFilter(debug=False)
+    @classmethod
+    def setUpClass(cls):
+        cls.filter = AffiliationFilter(debug=False)
     
     def test_academic_author_identification(self):
         """Test identification of academic authors."""
@@ -131,6 +305,43 @@ class TestAffiliationFilter(unittest.TestCase):
         result = self.filter.is_industry_affiliation(industry_author)
         self.assertTrue(result)
     
+    def test_repeated_affiliations_are_memoized(self):
+        """Test that identical affiliations are scored only once."""
+        authors = [
+            Author("Johnson", "Jane", "J", "Pfizer Inc., Research Division", "jane@pfizer.com"),
+            Author("Lee", "Ann", "A", "PFIZER INC., Research Division", "JANE@pfizer.com")
+        ]
+
+        # A fresh filter, since the shared one has already cached other affiliations
+        affiliation_filter = AffiliationFilter(debug=False)
+        affiliation_filter.identify_industry_authors(authors)
+
+        self.assertEqual(affiliation_filter._cached_scores.cache_info().hits, 1)
+
+    def test_has_industry_author_stops_at_first_match(self):
+        """Test that the membership check returns on the first industry author."""
+        authors = [
+            Author("Johnson", "Jane", "J", "Pfizer Inc., Research Division", "jane@pfizer.com"),
+            Author("Smith", "John", "J", "Harvard University", "john@harvard.edu")
+        ]
+
+        with patch.object(self.filter, 'is_industry_affiliation', wraps=self.filter.is_industry_affiliation) as spy:
+            self.assertTrue(self.filter.has_industry_author(authors))
+
+        spy.assert_called_once()
+
+    def test_classify_authors_returns_companies(self):
+        """Test that industry authors and their companies come back together."""
+        authors = [
+            Author("Johnson", "Jane", "J", "Pfizer Inc., Research Division", "jane@pfizer.com"),
+            Author("Smith", "John", "J", "Harvard University", "john@harvard.edu")
+        ]
+
+        industry_authors, companies = self.filter.classify_authors(authors)
+
+        self.assertEqual([author.last_name for author in industry_authors], ["Johnson"])
+        self.assertEqual(companies, ["Pfizer Inc."])
+
     def test_email_domain_scoring(self):
         """Test email domain scoring algorithm."""
         # Academic email
@@ -151,18 +362,64 @@ class TestAffiliationFilter(unittest.TestCase):
         industry_score = self.filter._score_affiliation_text("pfizer pharmaceutical company")
         self.assertGreater(industry_score, 0)
 
+    def test_scoring_helpers_receive_lowercased_text(self):
+        """Test that every caller lowercases text before the scoring helpers see it."""
+        score_filter = AffiliationFilter(debug=False)
+        score_email = score_filter._score_email_domain
+        score_affiliation = score_filter._score_affiliation_text
+
+        def checked_email(email_lower):
+            self.assertEqual(email_lower, email_lower.lower())
+            return score_email(email_lower)
+
+        def checked_affiliation(affiliation_lower):
+            self.assertEqual(affiliation_lower, affiliation_lower.lower())
+            return score_affiliation(affiliation_lower)
+
+        authors = [
+            Author("Smith", "John", "J", "Pfizer INC., New York", "John.Smith@PFIZER.COM"),
+            Author("Roe", "Rick", "R", "HARVARD University", "Rick@Harvard.EDU")
+        ]
+        with patch.object(score_filter, '_score_email_domain', side_effect=checked_email) as email_mock, \
+                patch.object(score_filter, '_score_affiliation_text', side_effect=checked_affiliation) as affiliation_mock:
+            industry_authors, _ = score_filter.classify_authors(authors)
+
+        self.assertEqual(email_mock.call_count, 2)
+        self.assertEqual(affiliation_mock.call_count, 2)
+        self.assertEqual([author.last_name for author in industry_authors], ["Smith"])
+
+    def test_keyword_matching_without_automaton(self):
+        """Test that the plain substring fallback scores affiliations identically."""
+        affiliations = [
+            "department of oncology, mayo clinic, rochester, mn",
+            "genentech inc., south san francisco, ca",
+            "institute of biotechnology, university of helsinki",
+            ""
+        ]
+        with patch('paper_finder.filter.ahocorasick', None):
+            fallback_filter = AffiliationFilter(debug=False)
+
+        for affiliation in affiliations:
+            self.assertEqual(
+                fallback_filter._score_affiliation_text(affiliation),
+                self.filter._score_affiliation_text(affiliation)
+            )
+
 
 class TestCSVExporter(unittest.TestCase):
     """Test CSV export functionality."""
     
-    def setUp(self):
-        self.exporter = CSVExporter(debug=False)
-        self.temp_dir = tempfile.mkdtemp()
+    @classmethod
+    def setUpClass(cls):
+        cls.exporter = CSVExporter(debug=False)
+        # Shared by the tests in this class, which write distinct file names
+        cls.temp_dir = tempfile.mkdtemp(dir=_TEMP_ROOT)
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         # Clean up temporary files
         import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
     
     def test_csv_export_structure(self):
         """Test CSV export creates correct structure."""
@@ -177,7 +434,8 @@ class TestCSVExporter(unittest.TestCase):
         self.assertTrue(os.path.exists(output_file))
         
         # Verify CSV structure
-        df = pd.read_csv(output_file)
+        with open(output_file, newline='', encoding='utf-8') as handle:
+            columns = csv.DictReader(handle).fieldnames
         expected_columns = [
             "PubmedID", "Title", "Publication Date", "Non-academic Author(s)",
             "Company Affiliation(s)", "Corresponding Author Email", "Journal",
@@ -185,8 +443,22 @@ class TestCSVExporter(unittest.TestCase):
         ]
         
         for col in expected_columns:
-            self.assertIn(col, df.columns)
-    
+            self.assertIn(col, columns)
+
+    def test_export_recreates_removed_directory(self):
+        """Test that an output directory removed between exports is created again."""
+        import shutil
+        authors = [Author("Smith", "John", "J", "Pfizer Inc.", "john@pfizer.com")]
+        papers = [Paper("12345", "Test Paper", "2024-01-01", authors)]
+        output_dir = os.path.join(self.temp_dir, "exports")
+        output_file = os.path.join(output_dir, "results.csv")
+
+        self.exporter.export_papers(papers, output_file)
+        shutil.rmtree(output_dir)
+        self.exporter.export_papers(papers, output_file)
+
+        self.assertTrue(os.path.exists(output_file))
+
     def test_author_formatting(self):
         """Test author name formatting."""
         authors = [
@@ -199,12 +471,40 @@ class TestCSVExporter(unittest.TestCase):
         self.assertIn("Smith, John", result)
         self.assertIn("Doe, J.D.", result)
 
+    def test_detailed_report_has_row_per_industry_author(self):
+        """Test that the detailed report lists each industry author separately."""
+        authors = [
+            Author("Smith", "John", "J", "Pfizer Inc.", "john@pfizer.com"),
+            Author("Doe", "Jane", "J", "Novartis AG, Basel", "jane@novartis.com"),
+            Author("Roe", "Rick", "R", "Harvard University", "rick@harvard.edu")
+        ]
+        papers = [Paper("12345", "Test Paper", "2024-01-01", authors, journal="Test Journal")]
+        output_file = os.path.join(self.temp_dir, "report.csv")
+
+        self.exporter.export_detailed_report(papers, output_file)
+
+        with open(os.path.join(self.temp_dir, "report_detailed.csv"), newline='', encoding='utf-8') as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual([row["Author Last Name"] for row in rows], ["Smith", "Doe"])
+
+    def test_exporter_reuses_given_filter(self):
+        """Test that an exporter classifies with the caller's filter and its caches."""
+        filter_obj = AffiliationFilter()
+        exporter = CSVExporter(filter_obj=filter_obj)
+        author = Author("Doe", "Jane", "J", "Pfizer Inc., New York, USA")
+
+        filter_obj.is_industry_affiliation(author)
+        exporter.filter.get_company_affiliations([author])
+
+        self.assertIs(exporter.filter, filter_obj)
+        self.assertEqual(filter_obj._cached_scores.cache_info().hits, 1)
+
 
 class TestIntegration(unittest.TestCase):
     """Integration tests for the complete workflow."""
     
     def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = tempfile.mkdtemp(dir=_TEMP_ROOT)
     
     def tearDown(self):
         import shutil
@@ -234,8 +534,9 @@ class TestIntegration(unittest.TestCase):
         
         # Verify results
         self.assertTrue(os.path.exists(output_file))
-        df = pd.read_csv(output_file)
-        self.assertGreater(len(df), 0)
+        with open(output_file, newline='', encoding='utf-8') as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertGreater(len(rows), 0)
 
 
 if __name__ == "__main__":
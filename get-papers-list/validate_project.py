@@ -4,16 +4,33 @@ Project validation and quality assurance script.
 Checks project structure, dependencies, and functionality.
 """
 
+import contextlib
+import io
 import os
 import sys
 import subprocess
-import importlib.util
+import importlib
+import unittest
 from pathlib import Path
 
 
-def check_file_exists(filepath, description):
-    """Check if a file exists."""
-    if os.path.exists(filepath):
+def _list_entries(directories):
+    """Collect the relative paths of the entries in each directory (one scandir each)."""
+    entries = set()
+    for directory in directories:
+        try:
+            with os.scandir(directory or ".") as it:
+                # Join with "/" to match how required paths are spelled on every OS
+                entries.update(f"{directory}/{entry.name}" if directory else entry.name for entry in it)
+        except OSError:
+            pass
+    return entries
+
+
+def check_file_exists(filepath, description, entries=None):
+    """Check if a file exists, using a prefetched set of paths when given."""
+    exists = filepath in entries if entries is not None else os.path.exists(filepath)
+    if exists:
         print(f"✅ {description}: {filepath}")
         return True
     else:
@@ -39,9 +56,10 @@ def check_directory_structure():
         ("test_cli.py", "CLI tests")
     ]
     
+    entries = _list_entries({os.path.dirname(filepath) for filepath, _ in required_files})
     all_exist = True
     for filepath, description in required_files:
-        if not check_file_exists(filepath, description):
+        if not check_file_exists(filepath, description, entries):
             all_exist = False
     
     return all_exist
@@ -53,14 +71,17 @@ def check_poetry_configuration():
     print("=" * 50)
     
     try:
-        import toml
-    except ImportError:
-        print("❌ toml package not available for validation")
-        return False
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            print("❌ tomli package not available for validation")
+            return False
     
     try:
-        with open("pyproject.toml", "r") as f:
-            config = toml.load(f)
+        with open("pyproject.toml", "rb") as f:
+            config = tomllib.load(f)
         
         # Check required sections
         checks = [
@@ -112,12 +133,8 @@ def check_imports():
     all_imported = True
     for module_name in modules_to_test:
         try:
-            spec = importlib.util.spec_from_file_location(
-                module_name, 
-                module_name.replace(".", "/") + ".py"
-            )
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            # Registers the module in sys.modules, so the tests reuse it
+            importlib.import_module(module_name)
             print(f"✅ {module_name}: Import successful")
         except Exception as e:
             print(f"❌ {module_name}: Import failed - {e}")
@@ -203,34 +220,30 @@ def run_tests():
     print("=" * 50)
     
     try:
-        # Run unit tests
-        result = subprocess.run(
-            [sys.executable, "test_paper_finder.py"],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        # Run unit tests in this process
+        import test_paper_finder
+        output = io.StringIO()
+        suite = unittest.TestLoader().loadTestsFromModule(test_paper_finder)
+        result = unittest.TextTestRunner(stream=output).run(suite)
         
-        if result.returncode == 0:
+        if result.wasSuccessful():
             print("✅ Unit tests passed")
             unit_tests_ok = True
         else:
-            print(f"❌ Unit tests failed: {result.stderr}")
+            print(f"❌ Unit tests failed: {output.getvalue()}")
             unit_tests_ok = False
         
-        # Run CLI tests
-        result = subprocess.run(
-            [sys.executable, "test_cli.py"],
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
+        # Run CLI tests in this process, keeping their report unless they fail
+        import test_cli
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            returncode = test_cli.main()
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("✅ CLI tests passed")
             cli_tests_ok = True
         else:
-            print(f"❌ CLI tests failed: {result.stderr}")
+            print(f"❌ CLI tests failed: {output.getvalue()}")
             cli_tests_ok = False
         
         return unit_tests_ok and cli_tests_ok
@@ -5,25 +5,126 @@ By Manideep Reddy Eevuri
 """
 
 import os
+import hashlib
 import json
 import logging
+import threading
+import time
+from collections import deque
 from typing import List, Dict, Any, Optional
 from groq import Groq
 
+
+class _RequestWindow:
+    """Lets at most ``limit`` requests start in any ``period``-second window."""
+
+    def __init__(self, limit: int, period: float = 60.0):
+        if limit < 1:
+            raise ValueError(f"Request limit must be at least 1, got {limit}")
+        self.limit = limit
+        self.period = period
+        self._starts = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller may issue its request."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._starts and now - self._starts[0] >= self.period:
+                    self._starts.popleft()
+                if len(self._starts) < self.limit:
+                    self._starts.append(now)
+                    return
+                wait = self.period - (now - self._starts[0])
+            time.sleep(wait)
+
+
 class GroqLLMService:
     """Service for interacting with Groq API for paper analysis."""
     
-    def __init__(self, api_key: str, model: str = "llama3-8b-8192"):
+    # Reply budget per paper when several papers share one summary request
+    SUMMARY_TOKENS_PER_PAPER = 300
+    
+    # Abstracts are cut to about 1500 tokens (~4 characters each) so prompt size stays predictable
+    MAX_ABSTRACT_CHARS = 6000
+    
+    # Replies sampled above this temperature are expected to vary, so they are not cached
+    MAX_CACHED_TEMPERATURE = 0.5
+    
+    def __init__(self, api_key: str, model: str = "llama3-8b-8192", cache=None, rpm: int = 30):
         """
         Initialize the Groq LLM service.
         
         Args:
             api_key: Groq API key
             model: Model to use (default: llama3-8b-8192)
+            cache: Optional store (get/set by key, e.g. a search store) used to
+                reuse replies to identical prompts
+            rpm: Requests per minute allowed by the Groq account; calls beyond
+                it wait instead of being rejected with a 429
         """
+        # The client itself still retries the occasional 429 with backoff
         self.client = Groq(api_key=api_key)
         self.model = model
+        self.cache = cache
+        self._request_window = _RequestWindow(rpm)
         self.logger = logging.getLogger(__name__)
+
+    def _complete(self, system: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        """
+        Return the model's reply to a prompt, reusing a cached reply when possible.
+        
+        Replies are keyed by a hash of everything sent to the model, so an
+        identical request (e.g. summarizing the same paper again) skips Groq.
+        """
+        use_cache = self.cache is not None and temperature <= self.MAX_CACHED_TEMPERATURE
+        if use_cache:
+            key = hashlib.sha256(
+                json.dumps([self.model, system, prompt, temperature, max_tokens]).encode('utf-8')
+            ).hexdigest()
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached['content']
+        
+        self._request_window.acquire()
+        response = self.client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            # Every prompt here asks for a JSON object; JSON mode guarantees one
+            response_format={"type": "json_object"}
+        )
+        content = response.choices[0].message.content.strip()
+        
+        if use_cache:
+            self.cache.set(key, {'content': content})
+        return content
+
+    @classmethod
+    def _truncate_abstract(cls, abstract: Optional[str]) -> Optional[str]:
+        """Shorten an abstract to MAX_ABSTRACT_CHARS, cutting at a word boundary."""
+        if not abstract or len(abstract) <= cls.MAX_ABSTRACT_CHARS:
+            return abstract
+        return abstract[:cls.MAX_ABSTRACT_CHARS].rsplit(' ', 1)[0] + '...'
+
+    @staticmethod
+    def _parse_json(content: str) -> Any:
+        """
+        Parse a JSON reply.
+        
+        Replies are requested in JSON mode; a markdown code block around the
+        JSON is still removed in case a model ignores it.
+        """
+        if content.startswith('```json'):
+            content = content[7:]
+        if content.endswith('```'):
+            content = content[:-3]
+        return json.loads(content)
         
     def summarize_paper(self, title: str, abstract: str = None, authors: List[str] = None) -> Dict[str, Any]:
         """
@@ -46,7 +147,7 @@ class GroqLLMService:
             """
             
             if abstract:
-                prompt += f"\nAbstract: {abstract}"
+                prompt += f"\nAbstract: {self._truncate_abstract(abstract)}"
             
             if authors:
                 prompt += f"\nAuthors: {', '.join(authors[:5])}{'...' if len(authors) > 5 else ''}"
@@ -63,29 +164,16 @@ class GroqLLMService:
             Format your response as JSON with keys: summary, key_findings, methodology, impact, industry_relevance
             """
             
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a research analyst expert at summarizing scientific papers. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
+            content = self._complete(
+                "You are a research analyst expert at summarizing scientific papers. Always respond with valid JSON.",
+                prompt,
                 temperature=0.3,
                 max_tokens=1000
             )
             
-            # Parse the response
-            content = response.choices[0].message.content.strip()
-            
             # Try to extract JSON from the response
             try:
-                # Remove markdown code blocks if present
-                if content.startswith('```json'):
-                    content = content[7:]
-                if content.endswith('```'):
-                    content = content[:-3]
-                
-                result = json.loads(content)
-                return result
+                return self._parse_json(content)
             except json.JSONDecodeError:
                 # Fallback: return raw content
                 return {
@@ -107,6 +195,67 @@ class GroqLLMService:
                 "error": str(e)
             }
     
+    def summarize_papers(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Summarize several papers with a single request.
+        
+        Args:
+            papers: Dictionaries with title and optional abstract and authors,
+                as accepted by summarize_paper
+            
+        Returns:
+            One summary dictionary per paper, in the same order. If the reply
+            does not hold one summary per paper, each paper is summarized with
+            its own request instead.
+        """
+        if len(papers) <= 1:
+            return [self.summarize_paper(**paper) for paper in papers]
+        
+        try:
+            listing = [
+                {
+                    "id": i,
+                    "title": paper.get('title'),
+                    "abstract": self._truncate_abstract(paper.get('abstract')),
+                    "authors": (paper.get('authors') or [])[:5]
+                }
+                for i, paper in enumerate(papers)
+            ]
+            
+            prompt = f"""
+            Analyze these research papers and provide a summary of each:
+            
+            {json.dumps(listing, ensure_ascii=False)}
+            
+            For each paper provide:
+            1. A concise summary (2-3 sentences)
+            2. Key findings or contributions
+            3. Research methodology (if mentioned)
+            4. Potential impact or significance
+            5. Industry relevance (if any)
+            
+            Format your response as a JSON object with key "summaries": an array where element i corresponds to the paper with id i, each with keys: summary, key_findings, methodology, impact, industry_relevance
+            """
+            
+            content = self._complete(
+                "You are a research analyst expert at summarizing scientific papers. Always respond with valid JSON.",
+                prompt,
+                temperature=0.3,
+                max_tokens=self.SUMMARY_TOKENS_PER_PAPER * len(papers)
+            )
+            reply = self._parse_json(content)
+            summaries = reply.get('summaries') if isinstance(reply, dict) else reply
+            
+            if (isinstance(summaries, list) and len(summaries) == len(papers)
+                    and all(isinstance(summary, dict) for summary in summaries)):
+                return summaries
+            self.logger.warning(f"Batch summary did not match {len(papers)} papers; summarizing individually")
+            
+        except Exception as e:
+            self.logger.error(f"Error summarizing papers: {e}")
+        
+        return [self.summarize_paper(**paper) for paper in papers]
+    
     def analyze_research_trends(self, papers_data: List[Dict]) -> Dict[str, Any]:
         """
         Analyze research trends across multiple papers.
@@ -120,9 +269,11 @@ class GroqLLMService:
         try:
             # Prepare data for analysis
             titles = [paper.get('title', '') for paper in papers_data[:20]]  # Limit to 20 papers
-            companies = []
+            companies = set()
             for paper in papers_data:
-                companies.extend(paper.get('companies', []))
+                companies.update(paper.get('companies', []))
+            # Sorted so the prompt (and its cache key) is the same on every run
+            companies = sorted(companies)
             
             prompt = f"""
             Analyze these research papers and identify trends:
@@ -131,7 +282,7 @@ class GroqLLMService:
             {chr(10).join([f"- {title}" for title in titles[:15]])}
             
             Companies/Organizations involved:
-            {', '.join(list(set(companies))[:20])}
+            {', '.join(companies[:20])}
             
             Please identify:
             1. Main research themes and topics
@@ -143,31 +294,21 @@ class GroqLLMService:
             Format as JSON with keys: themes, trends, key_players, methodologies, future_directions
             """
             
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a research trend analyst. Provide insights in valid JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
+            content = self._complete(
+                "You are a research trend analyst. Provide insights in valid JSON format.",
+                prompt,
                 temperature=0.4,
                 max_tokens=1200
             )
             
-            content = response.choices[0].message.content.strip()
-            
             # Parse JSON response
             try:
-                if content.startswith('```json'):
-                    content = content[7:]
-                if content.endswith('```'):
-                    content = content[:-3]
-                
-                return json.loads(content)
+                return self._parse_json(content)
             except json.JSONDecodeError:
                 return {
                     "themes": ["Analysis in progress"],
                     "trends": ["Trend analysis available"],
-                    "key_players": list(set(companies))[:10],
+                    "key_players": companies[:10],
                     "methodologies": ["Various research methods"],
                     "future_directions": ["Continued research expected"]
                 }
@@ -210,25 +351,15 @@ class GroqLLMService:
             Format as JSON with keys: enhanced_query, alternatives, industry_terms, search_tips
             """
             
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a PubMed search expert. Help optimize queries for finding industry-academic collaborations."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
+            content = self._complete(
+                "You are a PubMed search expert. Help optimize queries for finding industry-academic collaborations.",
+                prompt,
                 temperature=0.3,
                 max_tokens=800
             )
             
-            content = response.choices[0].message.content.strip()
-            
             try:
-                if content.startswith('```json'):
-                    content = content[7:]
-                if content.endswith('```'):
-                    content = content[:-3]
-                
-                return json.loads(content)
+                return self._parse_json(content)
             except json.JSONDecodeError:
                 return {
                     "enhanced_query": f"({original_query}) AND (industry[Affiliation] OR pharmaceutical[Affiliation] OR biotech[Affiliation])",
@@ -281,25 +412,15 @@ class GroqLLMService:
             Format as JSON with keys: significance, collaboration_strength, commercial_potential, quality_indicators, follow_up_opportunities
             """
             
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a research analyst specializing in industry-academic collaborations."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
+            content = self._complete(
+                "You are a research analyst specializing in industry-academic collaborations.",
+                prompt,
                 temperature=0.3,
                 max_tokens=1000
             )
             
-            content = response.choices[0].message.content.strip()
-            
             try:
-                if content.startswith('```json'):
-                    content = content[7:]
-                if content.endswith('```'):
-                    content = content[:-3]
-                
-                return json.loads(content)
+                return self._parse_json(content)
             except json.JSONDecodeError:
                 return {
                     "significance": "High potential research significance",
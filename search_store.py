@@ -0,0 +1,188 @@
+"""
+Storage for background search state shared by the request handlers and
+the search workers.
+
+The default store lives in this process and keeps a bounded number of
+recent searches. Setting REDIS_URL switches to a Redis-backed store so every
+web worker sees the same searches. Either way, old searches expire on their own.
+"""
+
+import dataclasses
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # optional; only needed when REDIS_URL is set
+    redis = None
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib json module is used instead
+    orjson = None
+
+
+def _json_default(value):
+    """Encode result dataclasses (e.g. serialized authors) as plain dicts."""
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_default)
+    return json.dumps(value, default=_json_default)
+
+
+def _loads(value):
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+class MemorySearchStore:
+    """
+    Search state held in this process, bounded in size and age.
+
+    At most ``max_searches`` searches are kept, evicting the least recently
+    updated first, and a search expires ``ttl`` seconds after its last update.
+    """
+
+    def __init__(self, max_searches=1000, ttl=3600):
+        """
+        Initialize the in-process store.
+
+        Args:
+            max_searches: Maximum number of searches kept
+            ttl: Seconds a search is kept after its last update
+        """
+        self.max_searches = max_searches
+        self.ttl = ttl
+        # search_id -> (expires_at, state), ordered from oldest to newest update
+        self._searches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, search_id, state):
+        now = time.monotonic()
+        self._searches[search_id] = (now + self.ttl, state)
+        self._searches.move_to_end(search_id)
+
+        # Entries are ordered by last update, so expired ones sit at the front
+        while self._searches:
+            oldest_id, (expires_at, _) = next(iter(self._searches.items()))
+            if expires_at > now and len(self._searches) <= self.max_searches:
+                break
+            del self._searches[oldest_id]
+
+    def set(self, search_id, state):
+        """Replace the whole state of a search."""
+        with self._lock:
+            self._store(search_id, dict(state))
+
+    def update(self, search_id, **fields):
+        """Update selected fields of an existing search (ignored once evicted)."""
+        with self._lock:
+            entry = self._searches.get(search_id)
+            if entry is not None:
+                entry[1].update(fields)
+                self._store(search_id, entry[1])
+
+    def get(self, search_id):
+        """Return the state of a search, or None if it is unknown or expired."""
+        with self._lock:
+            entry = self._searches.get(search_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._searches[search_id]
+                return None
+            return entry[1]
+
+    def delete(self, search_id):
+        """Forget a search; later updates from its worker are ignored."""
+        with self._lock:
+            self._searches.pop(search_id, None)
+
+
+class RedisSearchStore:
+    """
+    Search state held in Redis, one hash per search.
+
+    Each top-level field is stored JSON-encoded in its own hash slot, so
+    progress updates rewrite only the fields that changed. Every write
+    refreshes the key's expiry.
+    """
+
+    def __init__(self, url, ttl=3600, prefix='search:'):
+        """
+        Initialize the Redis store.
+
+        Args:
+            url: Redis connection URL, e.g. redis://localhost:6379/0
+            ttl: Seconds a search is kept after its last update
+            prefix: Key prefix for search hashes
+        """
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+
+    def _key(self, search_id):
+        return f"{self.prefix}{search_id}"
+
+    def set(self, search_id, state):
+        """Replace the whole state of a search."""
+        key = self._key(search_id)
+        pipe = self._redis.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={field: _dumps(value) for field, value in state.items()})
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def update(self, search_id, **fields):
+        """Update selected fields of an existing search (ignored once deleted or expired)."""
+        key = self._key(search_id)
+        mapping = {field: _dumps(value) for field, value in fields.items()}
+
+        def write(pipe):
+            # The key is WATCHed, so a delete after this check aborts the write
+            # (and the retry then sees the key gone) instead of recreating a
+            # partial hash
+            if not pipe.exists(key):
+                return
+            pipe.multi()
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self.ttl)
+
+        self._redis.transaction(write, key)
+
+    def get(self, search_id):
+        """Return the state of a search, or None if it is unknown or expired."""
+        raw = self._redis.hgetall(self._key(search_id))
+        if not raw:
+            return None
+        return {field.decode('utf-8'): _loads(value) for field, value in raw.items()}
+
+    def delete(self, search_id):
+        """Forget a search; later updates from its worker are ignored."""
+        self._redis.delete(self._key(search_id))
+
+
+def create_search_store(prefix='search:'):
+    """
+    Create the Redis store when REDIS_URL is set, else the in-process store.
+
+    Args:
+        prefix: Redis key prefix, so several stores can share one database
+    """
+    url = os.getenv('REDIS_URL')
+    ttl = int(os.getenv('SEARCH_TTL', '3600'))
+    if not url:
+        return MemorySearchStore(max_searches=int(os.getenv('SEARCH_MAX_ENTRIES', '1000')), ttl=ttl)
+
+    if redis is None:
+        raise ImportError("REDIS_URL is set but the 'redis' package is not installed (pip install redis)")
+    return RedisSearchStore(url, ttl=ttl, prefix=prefix)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the web application's background search.
+PubMed and Groq are mocked, so no network access or API key is needed.
+"""
+
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+# Keep the PubMed response cache out of the working directory
+os.environ.setdefault('PUBMED_CACHE_PATH', ':memory:')
+
+import app
+import search_store
+from paper_finder.fetch import PubMedFetcher
+
+try:
+    import fakeredis
+    import redis.client
+except ImportError:  # optional; the Redis store tests are skipped without it
+    fakeredis = None
+
+_ARTICLE_XML = (
+    b"<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>1</PMID><Article>"
+    b"<ArticleTitle>Kinase inhibitors</ArticleTitle><AuthorList><Author>"
+    b"<LastName>Smith</LastName><ForeName>John</ForeName><AffiliationInfo>"
+    b"<Affiliation>Pfizer Inc., New York, USA. john@pfizer.com</Affiliation>"
+    b"</AffiliationInfo></Author></AuthorList></Article></MedlineCitation></PubmedArticle>"
+    b"</PubmedArticleSet>"
+)
+
+
+def _groq_reply(content):
+    """A chat.completions.create result carrying one message."""
+    return Mock(choices=[Mock(message=Mock(content=content))])
+
+
+class TestSearchResultCache(unittest.TestCase):
+    """Test reuse of finished results for identical searches."""
+
+    def setUp(self):
+        patchers = [
+            # Fresh result cache, and no Groq reply cache hiding the failures
+            patch.object(app, 'result_cache', app.create_search_store(prefix='results:')),
+            patch.object(app.llm_service, 'cache', None),
+            patch.object(PubMedFetcher, 'search_papers', return_value=["1"]),
+            patch.object(PubMedFetcher, 'iter_paper_details', side_effect=lambda *a, **k: iter([_ARTICLE_XML])),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _search(self, query):
+        """Run one search synchronously and return its stored state."""
+        search_id = f"search_{query}"
+        app._set_search(search_id, {'status': 'queued', 'progress': '', 'results': None, 'error': None})
+        app.perform_search(search_id, query, None, False)
+        return app._get_search(search_id)
+
+    def test_failed_groq_summaries_are_not_cached(self):
+        """Test that a search whose Groq calls failed runs again next time."""
+        failing = patch.object(app.llm_service.client.chat.completions, 'create',
+                               side_effect=RuntimeError("429 rate limited"))
+        with failing, patch.object(app, '_analyze_papers', wraps=app._analyze_papers) as analyze:
+            first = self._search("groq-down")
+            self._search("groq-down")
+
+        self.assertEqual(first['status'], 'completed')
+        self.assertIn('error', first['results']['all_papers'][0]['llm_insights'])
+        self.assertEqual(analyze.call_count, 2)
+
+    def test_successful_results_are_reused(self):
+        """Test that an identical search reuses results with working summaries."""
+        reply = _groq_reply('{"summary": "ok", "key_findings": "", "methodology": "",'
+                            ' "impact": "", "industry_relevance": ""}')
+        working = patch.object(app.llm_service.client.chat.completions, 'create', return_value=reply)
+        with working, patch.object(app, '_analyze_papers', wraps=app._analyze_papers) as analyze:
+            first = self._search("groq-up")
+            self._search("groq-up")
+
+        self.assertEqual(first['results']['all_papers'][0]['llm_insights']['summary'], "ok")
+        self.assertEqual(analyze.call_count, 1)
+
+
+class TestSearchDeletion(unittest.TestCase):
+    """Test that deleted searches stay deleted."""
+
+    @unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+    def test_redis_update_racing_delete_does_not_recreate_search(self):
+        """Test that a worker update losing the race with DELETE writes nothing."""
+        with patch.object(search_store.redis.Redis, 'from_url', return_value=fakeredis.FakeRedis()):
+            store = search_store.RedisSearchStore('redis://localhost/0')
+        store.set('search_1', {'status': 'running', 'progress': 'Starting search...'})
+
+        # Delete the search just after update() has checked that it exists
+        start_transaction = redis.client.Pipeline.multi
+
+        def delete_then_multi(pipe):
+            store.delete('search_1')
+            return start_transaction(pipe)
+
+        with patch.object(redis.client.Pipeline, 'multi', delete_then_multi):
+            store.update('search_1', progress='Analyzing papers...')
+
+        self.assertIsNone(store.get('search_1'))
+
+    def test_status_of_state_without_status_is_not_found(self):
+        """Test that /status answers 404 rather than 500 for a partial state."""
+        with patch.object(app.search_store, 'get', return_value={'progress': 'Analyzing papers...'}):
+            response = app.app.test_client().get('/status/search_partial')
+
+        self.assertEqual(response.status_code, 404)
+
+
+@unittest.skipIf(app.orjson is None, "orjson is not installed")
+class TestOrjsonProvider(unittest.TestCase):
+    """Test that the orjson provider matches Flask's default JSON output."""
+
+    def setUp(self):
+        self.provider = app.OrjsonProvider(app.app)
+        self.default = app.DefaultJSONProvider(app.app)
+
+    def test_dumps_sorts_keys_like_default_provider(self):
+        """Test that keys come out sorted, as with DefaultJSONProvider."""
+        data = {'status': 'completed', 'error': None, 'progress': 'Done'}
+        self.assertEqual(self.provider.dumps(data), self.default.dumps(data, separators=(',', ':')))
+
+    def test_dumps_honours_json_options(self):
+        """Test that options such as indent are not silently dropped."""
+        data = {'b': 1, 'a': [1, 2]}
+        self.assertEqual(self.provider.dumps(data, indent=2), self.default.dumps(data, indent=2))
+
+    def test_response_matches_default_provider(self):
+        """Test that compact responses are byte-identical to Flask's."""
+        data = {'summary': {'total_papers': 2}, 'status': 'completed'}
+        with app.app.app_context():
+            ours = self.provider.response(data).get_data()
+            flask_default = self.default.response(data).get_data()
+        self.assertEqual(ours, flask_default)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,8 @@ import json
 def test_web_app():
     """Test the web application functionality."""
     base_url = "http://localhost:5000"
+    # One keep-alive connection for the health check, search and every status poll
+    session = requests.Session()
     
     print("🧪 Testing PubMed Paper Finder Web App")
     print("=" * 50)
@@ -17,7 +19,7 @@ def test_web_app():
     # Test 1: Health check
     print("1. Testing health check...")
     try:
-        response = requests.get(f"{base_url}/health", timeout=5)
+        response = session.get(f"{base_url}/health", timeout=5)
         if response.status_code == 200:
             print("✅ Health check passed")
         else:
@@ -38,7 +40,7 @@ def test_web_app():
     }
     
     try:
-        response = requests.post(f"{base_url}/search", json=search_data, timeout=10)
+        response = session.post(f"{base_url}/search", json=search_data, timeout=10)
         if response.status_code == 200:
             search_result = response.json()
             search_id = search_result.get('search_id')
@@ -46,18 +48,27 @@ def test_web_app():
             
             # Test 3: Status checking
             print("\n3. Testing status checking...")
-            max_attempts = 30
-            for attempt in range(max_attempts):
-                time.sleep(2)
-                status_response = requests.get(f"{base_url}/status/{search_id}", timeout=5)
+            # Poll quickly at first, backing off to every 2s, for up to a minute
+            deadline = time.monotonic() + 60
+            delay = 0.2
+            while time.monotonic() < deadline:
+                time.sleep(delay)
+                delay = min(2.0, delay * 1.5)
+                status_response = session.get(f"{base_url}/status/{search_id}", timeout=5)
                 if status_response.status_code == 200:
                     status_data = status_response.json()
-                    print(f"   Status: {status_data.get('status')} - {status_data.get('progress')}")
+                    status = status_data.get('status')
+                    print(f"   Status: {status} - {status_data.get('progress')}")
                     
-                    if status_data.get('status') == 'completed':
-                        results = status_data.get('results', {})
-                        summary = results.get('summary', {})
-                        papers = results.get('papers', [])
+                    if status == 'completed':
+                        summary = status_data.get('summary') or {}
+                        # /status only reports the summary; papers come from /paginate
+                        page_response = session.post(
+                            f"{base_url}/paginate/{search_id}",
+                            json={'page': 1, 'page_size': summary.get('page_size', 15)},
+                            timeout=5
+                        )
+                        papers = page_response.json().get('papers', []) if page_response.ok else []
                         
                         print(f"✅ Search completed successfully!")
                         print(f"   Total papers found: {summary.get('total_papers', 0)}")
@@ -69,7 +80,7 @@ def test_web_app():
                             print(f"   First paper: {papers[0].get('title', 'N/A')[:50]}...")
                         
                         return True
-                    elif status_data.get('status') == 'error':
+                    elif status == 'error':
                         print(f"❌ Search failed: {status_data.get('error')}")
                         return False
                 else: